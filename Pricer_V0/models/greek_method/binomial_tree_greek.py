@@ -2,42 +2,42 @@
 import math
 import numpy as np
 from pricing_method.binomial_tree import BinomialTreePricer
-from concurrent.futures import ThreadPoolExecutor
+from pricing_method.scenario_executor import ScenarioExecutor
 
 
 class BinomialTreeGreek:
     def __init__(self, option):
         self.option = option
     @staticmethod
-    def binomial_american_greeks(S, K, T, r, sigma, q, option_type, steps=100, dS_rel=0.01, dSigma_rel=0.01, dR_rel=0.01, dT=1/365):
+    def binomial_american_greeks(S, K, T, r, sigma, q, option_type, steps=100, dS_rel=0.01, dSigma_rel=0.01, dR_rel=0.01, dT=1/365, method="tree", parallel=True):
 
-        params = {"spot": S, "strike": K, "maturity": T, "rate": r, "volatility": sigma, "dividend_yield": q}
+        if method == "tree":
+            return BinomialTreeGreek._american_tree_greeks(S, K, T, r, sigma, q, option_type, steps, dSigma_rel, dR_rel)
+        elif method != "bump":
+            raise ValueError("method doit être 'tree' ou 'bump'.")
 
-        price_0 = BinomialTreePricer.price_vanilla_american(S, K, T, r, sigma, q, option_type, steps, american=True)
-
-        def bumped_price(param_name, bump):
-            original_value = params[param_name]
-            params[param_name] = original_value + bump
-            bumped_price = BinomialTreePricer.price_vanilla_american(
-                params["spot"], params["strike"], params["maturity"], params["rate"], params["volatility"],
-                params["dividend_yield"], option_type, steps, american=True
-            )
-            params[param_name] = original_value  # Rétablir la valeur d'origine
-            return bumped_price
-
-        
         dS = S * dS_rel
-        delta = (bumped_price("spot", dS) - bumped_price("spot", -dS)) / (2 * dS)
-        gamma = (bumped_price("spot", dS) - 2 * price_0 + bumped_price("spot", -dS)) / (dS ** 2)
-
         dSigma = sigma * dSigma_rel
-        vega = (bumped_price("volatility", dSigma) - price_0) / dSigma
-
         dR = r * dR_rel
-        rho = (bumped_price("rate", dR) - price_0) / dR
 
-        price_T_down = bumped_price("maturity", -dT)
-        theta = (price_T_down - price_0) / (-dT)
+        # Un scénario par prix bumpé, évalués ensemble par le pool de processus
+        base = {"S": S, "K": K, "T": T, "r": r, "sigma": sigma, "q": q,
+                "option_type": option_type, "steps": steps, "american": True}
+        prices = ScenarioExecutor.run(BinomialTreePricer.price_vanilla_american, {
+            "base": base,
+            "spot_up": {**base, "S": S + dS},
+            "spot_down": {**base, "S": S - dS},
+            "vol_up": {**base, "sigma": sigma + dSigma},
+            "rate_up": {**base, "r": r + dR},
+            "maturity_down": {**base, "T": T - dT},
+        }, parallel=parallel)
+        price_0 = prices["base"]
+
+        delta = (prices["spot_up"] - prices["spot_down"]) / (2 * dS)
+        gamma = (prices["spot_up"] - 2 * price_0 + prices["spot_down"]) / (dS ** 2)
+        vega = (prices["vol_up"] - price_0) / dSigma
+        rho = (prices["rate_up"] - price_0) / dR
+        theta = (prices["maturity_down"] - price_0) / (-dT)
 
         return {
             "Delta": float(delta),
@@ -50,9 +50,67 @@ class BinomialTreeGreek:
 
 
     @staticmethod
-    def binomial_barrier_greeks(S, K, T, r, sigma, q, option_type, barrier_level, barrier_type, rebate=0, steps=100, dS_rel=0.01, dSigma_rel=0.01, dR_rel=0.01, dT=1/365):
-    
-        params = {
+    def _american_tree_greeks(S, K, T, r, sigma, q, option_type, steps, dSigma_rel, dR_rel):
+        """ Delta, Gamma et Theta lus sur un arbre étendu de deux étapes avant t=0 """
+        dt = T / steps
+        u = math.exp(sigma * math.sqrt(dt))
+        dSigma = sigma * dSigma_rel
+        dR = r * dR_rel
+
+        # Racine en -2dt au spot S : l'étape 2 porte les noeuds S*u², S, S/u² à t=0.
+        # Les arbres bumpés (vol, taux) sont déroulés dans le même lot ; leur noeud
+        # central à l'étape 2 est le prix bumpé à t=0.
+        rates = np.array([r, r, r + dR])
+        volatilities = np.array([sigma, sigma + dSigma, sigma])
+        roots, layer = BinomialTreePricer._vanilla_batch_rollback(
+            np.full(3, float(S)), np.full(3, float(K)), np.full(3, T + 2 * dt), rates, volatilities,
+            np.full(3, float(q)), np.full(3, option_type == "call"), steps + 2, american=True, snapshot_step=2)
+
+        value_up, price_0, value_down = layer[:, 0]
+        spot_up, spot_down = S * u**2, S / u**2
+
+        delta = (value_up - value_down) / (spot_up - spot_down)
+        gamma = ((value_up - price_0) / (spot_up - S) - (price_0 - value_down) / (S - spot_down)) / (0.5 * (spot_up - spot_down))
+        # Même convention que la méthode par bump : variation du prix avec la maturité
+        theta = (roots[0] - price_0) / (2 * dt)
+
+        vega = (layer[1, 1] - price_0) / dSigma
+        rho = (layer[1, 2] - price_0) / dR
+
+        return {
+            "Delta": float(delta),
+            "Gamma": float(gamma),
+            "Vega": float(vega),
+            "Theta": float(theta),
+            "Rho": float(rho),
+        }
+
+    @staticmethod
+    def binomial_barrier_greeks(S, K, T, r, sigma, q, option_type, barrier_level, barrier_type, rebate=0, steps=100, dS_rel=0.01, dSigma_rel=0.01, dR_rel=0.01, dT=1/365, lattice="interpolated", parallel=True):
+        """ Grecques d'une barrière sur arbre ; Theta en dV/dT comme les grecques américaines.
+
+        Delta et Gamma sont lus aux noeuds S*u², S, S/u² d'un arbre enraciné
+        deux étapes avant t=0 (barrière active à partir de t=0). Vega, Theta et
+        Rho sont des différences centrées à géométrie fixe : u = exp(sigma
+        sqrt(T / steps)) et la couche-barrière ne bougent pas entre scénarios.
+        Vega : sigma * sqrt((steps +/- 2) / steps) sur steps +/- 2 étapes ;
+        Theta : T +/- 2dt sur steps +/- 2 étapes ; Rho : r +/- dR (u ne dépend
+        pas de r). dS_rel, dSigma_rel et dT sont conservés pour compatibilité
+        et ne sont plus utilisés.
+        """
+        if steps <= 2:
+            raise ValueError("steps doit être strictement supérieur à 2.")
+        dR = r * dR_rel
+        dt = T / steps
+
+        # Boyle-Lau : le nombre d'étapes aligné est fixé une fois pour tous les scénarios
+        if lattice == "aligned":
+            steps = BinomialTreePricer._aligned_barrier_steps(S, T, sigma, barrier_level, steps)
+            dt = T / steps
+            lattice = "crr"
+
+        base = {
+            "type_option": option_type,
             "spot": S,
             "strike": K,
             "maturity": T,
@@ -61,39 +119,31 @@ class BinomialTreeGreek:
             "dividend_yield": q,
             "barrier_level": barrier_level,
             "barrier_type": barrier_type,
-            "rebate": rebate
+            "rebate": rebate,
+            "steps": steps,
+            "lattice": lattice
         }
-
-
-        price_0 = BinomialTreePricer.price_barrier_binomial(option_type, S, K, T, r, sigma, q, barrier_level, barrier_type, rebate, steps)
-        
-        def bumped_price(param_name, bump):
-            """ Calcule le prix après avoir modifié un paramètre donné """
-            original_value = params[param_name]
-            params[param_name] = original_value + bump
-            bumped_price = BinomialTreePricer.price_barrier_binomial(
-                option_type,
-                params["spot"], params["strike"], params["maturity"], params["rate"],
-                params["volatility"], params["dividend_yield"],
-                params["barrier_level"], params["barrier_type"], params["rebate"],
-                steps
-            )
-            params[param_name] = original_value  # Restaurer la valeur originale
-            return bumped_price
+        (value_up, price_0, value_down), (spot_up, _, spot_down) = BinomialTreePricer.barrier_binomial_nodes(
+            **base, extra_steps=2)
+
+        # Un scénario par prix bumpé, évalués ensemble par le pool de processus
+        sigma_up = sigma * math.sqrt((steps + 2) / steps)
+        sigma_down = sigma * math.sqrt((steps - 2) / steps)
+        prices = ScenarioExecutor.run(BinomialTreePricer.price_barrier_binomial, {
+            "vol_up": {**base, "volatility": sigma_up, "steps": steps + 2},
+            "vol_down": {**base, "volatility": sigma_down, "steps": steps - 2},
+            "rate_up": {**base, "rate": r + dR},
+            "rate_down": {**base, "rate": r - dR},
+            "maturity_up": {**base, "maturity": T + 2 * dt, "steps": steps + 2},
+            "maturity_down": {**base, "maturity": T - 2 * dt, "steps": steps - 2},
+        }, parallel=parallel)
 
         # Calcul des grecques
-        dS = S * dS_rel
-        delta = (bumped_price("spot", dS) - bumped_price("spot", -dS)) / (2 * dS)
-        gamma = (bumped_price("spot", dS) - 2 * price_0 + bumped_price("spot", -dS)) / (dS ** 2)
-        
-        dSigma = sigma * dSigma_rel
-        vega = (bumped_price("volatility", dSigma) - price_0) / dSigma
-        
-        dR = r * dR_rel
-        rho = (bumped_price("rate", dR) - price_0) / dR
-        
-        price_T_down = bumped_price("maturity", -dT)
-        theta = (price_T_down - price_0) / (-dT)
+        delta = (value_up - value_down) / (spot_up - spot_down)
+        gamma = ((value_up - price_0) / (spot_up - S) - (price_0 - value_down) / (S - spot_down)) / (0.5 * (spot_up - spot_down))
+        vega = (prices["vol_up"] - prices["vol_down"]) / (sigma_up - sigma_down)
+        rho = (prices["rate_up"] - prices["rate_down"]) / (2 * dR)
+        theta = (prices["maturity_up"] - prices["maturity_down"]) / (4 * dt)
 
         # Retourner les grecques
         return {
@@ -108,7 +158,7 @@ class BinomialTreeGreek:
     @staticmethod
     def binomial_autocall_greeks(spot, strike, maturity, rate, volatility, dividend_yield,
                                   coupon, barrier, protection_barrier, type_autocall='athena',
-                                  frequency_per_year='semi-annual', steps=500, memory_feature=True):
+                                  frequency_per_year='semi-annual', steps=500, memory_feature=True, parallel=True):
   
         # Configuration des perturbations
         dt = maturity / steps if steps > 0 and maturity > 0 else 0.0
@@ -120,35 +170,32 @@ class BinomialTreeGreek:
         theta_maturity = max(1e-5, maturity - 1/365)
         theta_steps = int(theta_maturity / dt) if dt > 0 else steps
 
-        # Fonction de pricing générique
-        def generate_scenario(_spot=spot, _maturity=maturity, _rate=rate, _volatility=volatility, _steps=steps):
-            return BinomialTreePricer.price_autocall(
-                spot=_spot,
-                strike=strike,
-                maturity=_maturity,
-                rate=_rate,
-                volatility=max(0.0001, _volatility),
-                dividend_yield=dividend_yield,
-                coupon=coupon,
-                barrier=barrier,
-                protection_barrier=protection_barrier,
-                type_autocall=type_autocall,
-                frequency_per_year=frequency_per_year,
-                steps=_steps,
-                memory_feature=memory_feature
-            )
-
-        # Calcul parallèle des scénarios
-        with ThreadPoolExecutor() as executor:
-            futures = {
-                'base': executor.submit(generate_scenario),
-                'up_spot': executor.submit(generate_scenario, _spot=spot + h_spot),
-                'down_spot': executor.submit(generate_scenario, _spot=spot - h_spot),
-                'vol_up': executor.submit(generate_scenario, _volatility=volatility + h_vol),
-                'rate_up': executor.submit(generate_scenario, _rate=rate + h_rate),
-                'theta': executor.submit(generate_scenario, _maturity=theta_maturity, _steps=theta_steps)
-            }
-            results = {k: f.result() for k, f in futures.items()}
+        # Paramètres de pricing communs à tous les scénarios
+        base = {
+            "spot": spot,
+            "strike": strike,
+            "maturity": maturity,
+            "rate": rate,
+            "volatility": max(0.0001, volatility),
+            "dividend_yield": dividend_yield,
+            "coupon": coupon,
+            "barrier": barrier,
+            "protection_barrier": protection_barrier,
+            "type_autocall": type_autocall,
+            "frequency_per_year": frequency_per_year,
+            "steps": steps,
+            "memory_feature": memory_feature
+        }
+
+        # Calcul parallèle des scénarios (pool de processus persistant)
+        results = ScenarioExecutor.run(BinomialTreePricer.price_autocall, {
+            'base': base,
+            'up_spot': {**base, "spot": spot + h_spot},
+            'down_spot': {**base, "spot": spot - h_spot},
+            'vol_up': {**base, "volatility": max(0.0001, volatility + h_vol)},
+            'rate_up': {**base, "rate": rate + h_rate},
+            'theta': {**base, "maturity": theta_maturity, "steps": theta_steps}
+        }, parallel=parallel)
 
         # Extraction des résultats
         price = results['base']
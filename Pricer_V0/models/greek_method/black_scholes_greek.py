@@ -1,156 +1,198 @@
 
 # black_scholes_greek.py
 
+import math
+from collections import namedtuple
 import numpy as np
-from scipy.stats import norm
 from option_models.option import Option
+from pricing_method.black_scholes import BlackScholesPricer
+from pricing_method.special_functions import norm_cdf, norm_pdf
+
+# Intermédiaires Black-Scholes partagés par les grecs du premier ordre et
+# d'ordre supérieur (sign : +1 call, -1 put ; cdf évaluées en sign * d ;
+# time_value : True si tous les contrats ont une valeur temps, sinon masque
+# des contrats où sigma sqrt(T) > 0)
+BlackScholesTerms = namedtuple("BlackScholesTerms", [
+    "S", "T", "r", "sigma", "q", "sign", "sqrt_T", "vol_sqrt_T", "d1", "d2",
+    "discount_q", "discount_r", "forward_q", "strike_r", "cdf_d1", "cdf_d2", "pdf_d1", "time_value"])
+
 
 class BlackScholesGreek:
     def __init__(self, option: Option):
         self.option = option
 
     @staticmethod
-    def bs_greeks(S, K, T, r, sigma, q, option_type):
-        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-
-        # Delta
-        if option_type == "call":
-            delta = np.exp(-q * T) * norm.cdf(d1)
-        elif option_type == "put":
-            delta = np.exp(-q * T) * (norm.cdf(d1) - 1)
-
-        # Gamma (indépendant du type d'option)
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T)) * np.exp(-q * T)
-
-        # Vega (indépendant du type d'option)
-        vega = S * np.exp(-q * T) * norm.pdf(d1) * np.sqrt(T)
-
-        # Theta
-        if option_type == "call":
-            theta = (-S * np.exp(-q * T) * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
-                     - r * K * np.exp(-r * T) * norm.cdf(d2)
-                     + q * S * np.exp(-q * T) * norm.cdf(d1))
-        elif option_type == "put":
-            theta = (-S * np.exp(-q * T) * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
-                     + r * K * np.exp(-r * T) * norm.cdf(-d2)
-                     - q * S * np.exp(-q * T) * norm.cdf(-d1))
-
-        # Rho
-        if option_type == "call":
-            rho = K * T * np.exp(-r * T) * norm.cdf(d2)
-        elif option_type == "put":
-            rho = -K * T * np.exp(-r * T) * norm.cdf(-d2)
+    def bs_price_greeks(S, K, T, r, sigma, q, option_type):
+        """Prix et grecs Black-Scholes calculés ensemble, vectorisés.
+
+        Mêmes entrées que BlackScholesPricer.price (tableaux ou scalaires
+        diffusés, option_type "call"/"put" ou booléens). d1, d2, les facteurs
+        d'actualisation, la cdf et la pdf sont évalués une seule fois.
+        Renvoie un dictionnaire de tableaux (colonnes) : Price, Delta, Gamma,
+        Vega, Theta (dV/dt), Rho (des floats pour un contrat scalaire).
+        """
+        terms = BlackScholesGreek._terms(S, K, T, r, sigma, q, option_type)
+        return BlackScholesGreek._first_order(terms)
 
-        return {
-        "Delta": float(delta),
-        "Gamma": float(gamma), 
-        "Vega": float(vega),
-        "Theta": float(theta),
-        "Rho": float(rho),
-    }
-
-
-class QuantoGreek:
     @staticmethod
-    def bs_greeks_quanto(S, K, T, r, sigma, q, fx_rate_volatility, fx_correlation, option_type):
-
-        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-
-        # Delta
-        if option_type == "call":
-            delta = np.exp(-q * T) * norm.cdf(d1)
-        elif option_type == "put":
-            delta = np.exp(-q * T) * (norm.cdf(d1) - 1)
+    def bs_greeks(S, K, T, r, sigma, q, option_type):
+        greeks = BlackScholesGreek.bs_price_greeks(S, K, T, r, sigma, q, option_type)
+        return {key: float(greeks[key]) for key in ("Delta", "Gamma", "Vega", "Theta", "Rho")}
 
-        # Gamma
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T)) * np.exp(-q * T)
+    @staticmethod
+    def _terms(S, K, T, r, sigma, q, option_type):
+        xp, (S, K, T, r, sigma, q), sign = BlackScholesPricer._inputs(S, K, T, r, sigma, q, option_type)
+
+        sqrt_T = xp.sqrt(T)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = BlackScholesPricer._d1(xp, S, K, T, r, sigma, q, vol_sqrt_T)
+        d2 = d1 - vol_sqrt_T
+
+        discount_q = xp.exp(-q * T)
+        discount_r = xp.exp(-r * T)
+        # Call : N(d1), N(d2) ; put : N(-d1), N(-d2) avec un signe opposé
+        return BlackScholesTerms(
+            S, T, r, sigma, q, sign, sqrt_T, vol_sqrt_T, d1, d2,
+            discount_q, discount_r, S * discount_q, K * discount_r,
+            norm_cdf(sign * d1), norm_cdf(sign * d2), norm_pdf(d1),
+            True if xp is math or np.all(vol_sqrt_T > 0) else vol_sqrt_T > 0)
 
-        # Vega
-        vega = S * np.exp(-q * T) * norm.pdf(d1) * np.sqrt(T)
+    @staticmethod
+    def _evaluate(time_value, function, *args):
+        # Sans valeur temps, les termes en n(d1) / (sigma sqrt(T)) sont indéfinis
+        # puis remplacés par 0 : pas d'avertissement numpy
+        if time_value is True:
+            return function(*args)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return function(*args)
 
-        # Theta
-        if option_type == "call":
-            theta = (-S * np.exp(-q * T) * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
-                     - r * K * np.exp(-r * T) * norm.cdf(d2)
-                     + q * S * np.exp(-q * T) * norm.cdf(d1))
-        elif option_type == "put":
-            theta = (-S * np.exp(-q * T) * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
-                     + r * K * np.exp(-r * T) * norm.cdf(-d2)
-                     - q * S * np.exp(-q * T) * norm.cdf(-d1))
+    @staticmethod
+    def _time_value_part(time_value, value):
+        # Part liée à la valeur temps, nulle là où T = 0 ou sigma = 0
+        return value if time_value is True else np.where(time_value, value, 0.0)[()]
 
-        # Rho
-        if option_type == "call":
-            rho = K * T * np.exp(-r * T) * norm.cdf(d2)
-        elif option_type == "put":
-            rho = -K * T * np.exp(-r * T) * norm.cdf(-d2)
+    @staticmethod
+    def _first_order(t):
+        return BlackScholesGreek._evaluate(t.time_value, BlackScholesGreek._first_order_values, t)
 
-        # Cross-Gamma
-        cross_gamma = -fx_correlation * S * fx_rate_volatility * sigma / (sigma**2)
+    @staticmethod
+    def _first_order_values(t):
+        # Gamma, Vega et la partie en pdf du Theta ne dépendent pas du type ;
+        # sans valeur temps, ils sont nuls et Delta est une indicatrice
+        part = BlackScholesGreek._time_value_part
+        pdf_term = t.forward_q * t.pdf_d1
+        return {
+            "Price": t.sign * (t.forward_q * t.cdf_d1 - t.strike_r * t.cdf_d2),
+            "Delta": t.sign * t.discount_q * t.cdf_d1,
+            "Gamma": part(t.time_value, pdf_term / (t.S**2 * t.vol_sqrt_T)),
+            "Vega": part(t.time_value, pdf_term * t.sqrt_T),
+            "Theta": part(t.time_value, -pdf_term * t.sigma / (2 * t.sqrt_T)) + t.sign * (t.q * t.forward_q * t.cdf_d1 - t.r * t.strike_r * t.cdf_d2),
+            "Rho": t.sign * t.T * t.strike_r * t.cdf_d2,
+        }
 
-        # Vanna
-        vanna = S * np.sqrt(T) * (1 - fx_correlation)
 
-        # Charm
-        charm = -S * sigma * np.sqrt(T) * 0.5
+class HigherOrderGreek:
+    @staticmethod
+    def bs_higher_order_greeks(S, K, T, r, sigma, q, option_type):
+        """Grecs d'ordre supérieur Black-Scholes, analytiques et vectorisés.
 
-        # Dual Delta
-        dual_delta = -np.exp(-r * T) * norm.cdf(-d2)
+        Mêmes entrées que BlackScholesGreek.bs_price_greeks. Renvoie Vanna
+        (d²V/dS dsigma), Volga (d²V/dsigma²), Charm (dDelta/dt), Speed
+        (d³V/dS³), Zomma (dGamma/dsigma), Color (dGamma/dt) et Dual Delta
+        (dV/dK), en temps calendaire comme le Theta.
+        """
+        terms = BlackScholesGreek._terms(S, K, T, r, sigma, q, option_type)
+        return HigherOrderGreek._higher_order(terms)
 
-        # Lambda (Elasticité)
-        lambda_value = (S / (S * np.exp(-q * T) * norm.cdf(d1))) * delta if delta != 0 else 0
+    @staticmethod
+    def _higher_order(t):
+        return BlackScholesGreek._evaluate(t.time_value, HigherOrderGreek._higher_order_values, t)
 
+    @staticmethod
+    def _higher_order_values(t):
+        # dq n(d1) et Gamma sont communs à la plupart des grecs ; les termes en
+        # n(d1) sont nuls sans valeur temps
+        part = BlackScholesGreek._time_value_part
+        density = t.discount_q * t.pdf_d1
+        gamma = density / (t.S * t.vol_sqrt_T)
+        vega = t.S * density * t.sqrt_T
+        # d(d1)/dT = drift / (2T), commun à Charm et Color
+        drift = (2 * (t.r - t.q) * t.T - t.d2 * t.vol_sqrt_T) / t.vol_sqrt_T
         return {
-            "Delta": float(delta),
-            "Gamma": float(gamma),
-            "Vega": float(vega),
-            "Theta": float(theta),
-            "Rho": float(rho),
-            "Cross-Gamma": float(cross_gamma),
-            "Vanna": float(vanna),
-            "Charm": float(charm),
-            "Dual Delta": float(dual_delta),
-            "Lambda": float(lambda_value)
+            "Vanna": part(t.time_value, -density * t.d2 / t.sigma),
+            "Volga": part(t.time_value, vega * t.d1 * t.d2 / t.sigma),
+            "Charm": t.sign * t.q * t.discount_q * t.cdf_d1 - part(t.time_value, density * drift / (2 * t.T)),
+            "Speed": part(t.time_value, -gamma / t.S * (t.d1 / t.vol_sqrt_T + 1)),
+            "Zomma": part(t.time_value, gamma * (t.d1 * t.d2 - 1) / t.sigma),
+            "Color": part(t.time_value, gamma / (2 * t.T) * (2 * t.q * t.T + 1 + drift * t.d1)),
+            "Dual Delta": -t.sign * t.discount_r * t.cdf_d2,
         }
-    
 
 
-class DigitGreek:
+class QuantoGreek:
     @staticmethod
-    def bs_greeks_digit(S, K, T, r, sigma, q, cash_payout, type_option, barrier=None, barrier_type=None):
+    def bs_greeks_quanto(S, K, T, r, sigma, q, fx_rate_volatility, fx_correlation, option_type,
+                         asset_volatility=None):
+        """Grecs d'une quanto pricée en Black-Scholes avec la volatilité ajustée sigma.
 
-        d2 = (np.log(S / K) + (r - q - 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        pdf_d2 = norm.pdf(d2)
-        
-        # Prix de base sans barrière
-        base_price = cash_payout * np.exp(-r * T)
+        asset_volatility est la volatilité propre du sous-jacent ; à défaut elle
+        est retrouvée à partir de sigma² = sigma_S² + sigma_fx² - 2 rho sigma_S sigma_fx.
+        Cross-Gamma : d²V/dS dsigma_fx = Vanna * dsigma/dsigma_fx.
+        """
+        terms = BlackScholesGreek._terms(S, K, T, r, sigma, q, option_type)
+        greeks = BlackScholesGreek._first_order(terms)
+        greeks.update(HigherOrderGreek._higher_order(terms))
 
-        # Delta
-        delta = (base_price / (S * sigma * np.sqrt(T))) * pdf_d2
+        if asset_volatility is None:
+            asset_volatility = fx_correlation * fx_rate_volatility + np.sqrt(
+                np.maximum(sigma**2 - fx_rate_volatility**2 * (1 - fx_correlation**2), 0.0))
+        greeks["Cross-Gamma"] = greeks["Vanna"] * (fx_rate_volatility - fx_correlation * asset_volatility) / sigma
 
-        # Gamma
-        gamma = (-delta / S) * (d2 / (S * sigma * np.sqrt(T)) + 1)
+        # Lambda (élasticité) : Delta * S / V
+        greeks["Lambda"] = greeks["Delta"] * S / greeks["Price"] if greeks["Price"] != 0 else 0.0
 
-        # Vega
-        vega = -base_price * pdf_d2 * d2 / sigma
+        keys = ("Delta", "Gamma", "Vega", "Theta", "Rho", "Cross-Gamma", "Vanna", "Volga",
+                "Charm", "Speed", "Zomma", "Color", "Dual Delta", "Lambda")
+        return {key: float(greeks[key]) for key in keys}
 
-        # Theta
-        theta = -base_price * pdf_d2 * (d2 / (2 * T) + r)
 
-        # Rho
-        rho = -cash_payout * T * np.exp(-r * T) * norm.cdf(d2) if type_option == "call" else \
-              cash_payout * T * np.exp(-r * T) * norm.cdf(-d2)
-
-        # Gestion des barrières (prix = 0 si la barrière est franchie)
-        if barrier:
-            if (barrier_type == "up" and S >= barrier) or (barrier_type == "down" and S <= barrier):
-                delta = gamma = vega = theta = rho = 0.0
+class DigitGreek:
+    @staticmethod
+    def bs_greeks_digit(S, K, T, r, sigma, q, cash_payout, type_option, barrier=None, barrier_type=None):
+        """Grecs d'une digitale cash-or-nothing, vectorisés (Theta en dV/dt).
+
+        Mêmes entrées diffusées que BlackScholesPricer.price_digital ; tous les
+        grecs sont nuls si la barrière est déjà franchie au spot.
+        """
+        xp, (S, K, T, r, sigma, q), sign = BlackScholesPricer._inputs(S, K, T, r, sigma, q, type_option)
+
+        sqrt_T = xp.sqrt(T)
+        vol_sqrt_T = sigma * sqrt_T
+        d1 = BlackScholesPricer._d1(xp, S, K, T, r, sigma, q, vol_sqrt_T)
+        d2 = d1 - vol_sqrt_T
+
+        # V = P e^(-rT) N(sign d2) ; density = sign P e^(-rT) n(d2) = dV/dd2
+        base_price = cash_payout * xp.exp(-r * T)
+        price = base_price * norm_cdf(sign * d2)
+        density = sign * base_price * norm_pdf(d2)
+        alive = BlackScholesPricer._digital_alive(S, barrier, barrier_type)
+
+        # Sans valeur temps, seule l'actualisation du paiement reste
+        time_value = True if xp is math or np.all(vol_sqrt_T > 0) else vol_sqrt_T > 0
+        greeks = BlackScholesGreek._evaluate(
+            time_value, DigitGreek._digit_values, S, T, r, sigma, q, sqrt_T, vol_sqrt_T, d1, d2, price, density, time_value)
+        if xp is math:
+            return {key: value * alive for key, value in greeks.items()}
+        return {key: (value * alive)[()] for key, value in greeks.items()}
 
+    @staticmethod
+    def _digit_values(S, T, r, sigma, q, sqrt_T, vol_sqrt_T, d1, d2, price, density, time_value):
+        part = BlackScholesGreek._time_value_part
         return {
-            "Delta": float(delta),
-            "Gamma": float(gamma),
-            "Vega": float(vega),
-            "Theta": float(theta),
-            "Rho": float(rho)
+            "Delta": part(time_value, density / (S * vol_sqrt_T)),
+            "Gamma": part(time_value, -density * d1 / (S * vol_sqrt_T)**2),
+            "Vega": part(time_value, -density * d1 / sigma),
+            # dd2/dT = -d2 / (2T) + (r - q - sigma²/2) / (sigma sqrt(T))
+            "Theta": r * price - part(time_value, density * (-d2 / (2 * T) + (r - q - 0.5 * sigma**2) / vol_sqrt_T)),
+            "Rho": -T * price + part(time_value, density * sqrt_T / sigma),
         }
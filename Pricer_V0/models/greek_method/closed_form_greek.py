@@ -0,0 +1,75 @@
+# closed_form_greek.py
+
+import numpy as np
+from greek_method.black_scholes_greek import BlackScholesGreek
+from pricing_method.closed_form import ClosedFormPricer
+
+
+class ClosedFormGreek:
+    @staticmethod
+    def geometric_asian_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+                               num_observations=None):
+        """Prix et grecs analytiques d'une asiatique géométrique, vectorisés.
+
+        Grecs Black-Scholes aux paramètres effectifs (sigma_eff, q_eff), puis
+        dérivation en chaîne vers sigma et r. a et c ne dépendent que du nombre
+        d'observations : Delta, Gamma et Theta (dV/dt) sont ceux de
+        Black-Scholes.
+        """
+        sigma_eff, q_eff, a, c = ClosedFormPricer._geometric_asian_parameters(
+            volatility, rate, dividend_yield, num_observations)
+        greeks = BlackScholesGreek.bs_price_greeks(spot, strike, maturity, rate, sigma_eff, q_eff, type_option)
+
+        # dV/dq_eff = -T S Delta ; dq_eff/dsigma = sigma (a - c) ; dq_eff/dr = 1 - a
+        dividend_sensitivity = -np.asarray(maturity, dtype=float) * np.asarray(spot, dtype=float) * greeks["Delta"]
+        greeks["Vega"] = greeks["Vega"] * c**0.5 + dividend_sensitivity * volatility * (a - c)
+        greeks["Rho"] = greeks["Rho"] + dividend_sensitivity * (1 - a)
+        return greeks
+
+    @staticmethod
+    def barrier_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+                       barrier_level, barrier_type, rebate=0.0, num_observations=None):
+        """Prix et grecs d'une barrière Reiner-Rubinstein, vectorisés (Theta en dV/dt)."""
+        return ClosedFormGreek._bumped_greeks(
+            ClosedFormPricer.price_barrier, spot, maturity, rate, volatility,
+            type_option=type_option, strike=strike, dividend_yield=dividend_yield,
+            barrier_level=barrier_level, barrier_type=barrier_type, rebate=rebate,
+            num_observations=num_observations)
+
+    @staticmethod
+    def lookback_greeks(type_option, spot, strike, maturity, rate, volatility, dividend_yield, strike_type,
+                        min_price_observed=None, max_price_observed=None, num_observations=None):
+        """Prix et grecs d'une lookback en formule fermée, vectorisés (Theta en dV/dt)."""
+        return ClosedFormGreek._bumped_greeks(
+            ClosedFormPricer.price_lookback, spot, maturity, rate, volatility,
+            type_option=type_option, strike=strike, dividend_yield=dividend_yield, strike_type=strike_type,
+            min_price_observed=min_price_observed, max_price_observed=max_price_observed,
+            num_observations=num_observations)
+
+    @staticmethod
+    def _bumped_greeks(price_function, spot, maturity, rate, volatility, **kwargs):
+        # Différences centrées d'une formule fermée vectorisée : les neuf
+        # scénarios sont évalués en un seul appel, sur un axe de tête
+        spot, maturity, rate, volatility = (np.asarray(x, dtype=float) for x in (spot, maturity, rate, volatility))
+        dS, dT = 1e-4 * spot, 1e-4 * maturity
+        dSigma = dR = 1e-4
+
+        # Scénarios : base, spot +/-, vol +/-, taux +/-, maturité +/-
+        zero = np.zeros_like(spot * maturity * rate * volatility)
+        bumps = np.array([
+            (0, 0, 0, 0), (1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0),
+            (0, 0, 1, 0), (0, 0, -1, 0), (0, 0, 0, 1), (0, 0, 0, -1)], dtype=float)
+        bumps = bumps.reshape(bumps.shape + (1,) * zero.ndim)
+        prices = price_function(
+            spot=spot + bumps[:, 0] * dS + zero, maturity=maturity + bumps[:, 3] * dT,
+            rate=rate + bumps[:, 2] * dR, volatility=volatility + bumps[:, 1] * dSigma, **kwargs)
+        base, spot_up, spot_down, vol_up, vol_down, rate_up, rate_down, maturity_up, maturity_down = prices
+
+        return {
+            "Price": base,
+            "Delta": (spot_up - spot_down) / (2 * dS),
+            "Gamma": (spot_up - 2 * base + spot_down) / dS**2,
+            "Vega": (vol_up - vol_down) / (2 * dSigma),
+            "Theta": -(maturity_up - maturity_down) / (2 * dT),
+            "Rho": (rate_up - rate_down) / (2 * dR),
+        }
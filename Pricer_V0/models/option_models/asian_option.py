@@ -2,7 +2,9 @@
     
 from option_models.exotic_option import ExoticOption  
 from pricing_method.monte_carlo import MonteCarloPricer
+from pricing_method.closed_form import ClosedFormPricer
 from greek_method.monte_carlo_greek import MonteCarloGreek
+from greek_method.closed_form_greek import ClosedFormGreek
 
 
 
@@ -19,7 +21,23 @@ class AsianOption(ExoticOption):
         self.average_type = average_type
         self.frequency = observation_frequency if average_type == 'arithmetic' else None
 
+    def _closed_form_args(self):
+        # Moyenne géométrique : formule fermée (continue si aucune fréquence)
+        return dict(
+            type_option=self.type_option,
+            spot=self.spot,
+            strike=self.strike,
+            maturity=self.maturity,
+            rate=self.rate,
+            volatility=self.volatility,
+            dividend_yield=self.dividend_yield,
+            num_observations=ClosedFormPricer.observation_count(self.maturity, self.observation_frequency)
+        )
+
     def price(self, num_paths=100000, time_steps=100):
+        if self.average_type == 'geometric':
+            return float(ClosedFormPricer.price_geometric_asian(**self._closed_form_args()))
+
         return MonteCarloPricer.price_asian(
             type_option=self.type_option,
             spot=self.spot,
@@ -35,7 +53,12 @@ class AsianOption(ExoticOption):
         )
 
     def greek(self, num_paths=100_000, time_steps=100, seed=None):
-        return MonteCarloGreek.montecarlo_asian_greeks(
+        """Grecques de l'asiatique, Theta en dV/dt (temps calendaire) quel que soit average_type."""
+        if self.average_type == 'geometric':
+            greeks = ClosedFormGreek.geometric_asian_greeks(**self._closed_form_args())
+            return {key: float(greeks[key]) for key in ("Delta", "Gamma", "Vega", "Theta", "Rho")}
+
+        greeks = MonteCarloGreek.montecarlo_asian_greeks(
             type_option=self.type_option,
             spot=self.spot,
             strike=self.strike,
@@ -49,6 +72,9 @@ class AsianOption(ExoticOption):
             time_steps=time_steps,
             seed=seed
         )
+        # L'estimateur Monte Carlo renvoie dV/dT
+        greeks["Theta"] = -greeks["Theta"]
+        return greeks
 
 
 
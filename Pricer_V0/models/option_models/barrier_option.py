@@ -3,7 +3,10 @@
 from option_models.exotic_option import ExoticOption
 from pricing_method.monte_carlo import MonteCarloPricer
 from pricing_method.binomial_tree import BinomialTreePricer
+from pricing_method.finite_difference import FiniteDifferencePricer
+from pricing_method.closed_form import ClosedFormPricer
 from greek_method.binomial_tree_greek import BinomialTreeGreek
+from greek_method.closed_form_greek import ClosedFormGreek
 
 class BarrierOption(ExoticOption):
     def __init__(self, barrier_level, barrier_type, rebate=0, **kwargs):
@@ -17,7 +20,41 @@ class BarrierOption(ExoticOption):
         self.barrier_type = barrier_type
         self.rebate = rebate
 
-    def price(self, num_paths=100000, time_steps=100):
+    def _closed_form_args(self):
+        # Reiner-Rubinstein ; correction BGK si num_observations est renseigné
+        return dict(
+            type_option=self.type_option,
+            spot=self.spot,
+            strike=self.strike,
+            maturity=self.maturity,
+            rate=self.rate,
+            volatility=self.volatility,
+            dividend_yield=self.dividend_yield,
+            barrier_level=self.barrier_level,
+            barrier_type=self.barrier_type,
+            rebate=self.rebate,
+            num_observations=self.num_observations
+        )
+
+    def price(self, num_paths=100000, time_steps=100, method="monte_carlo"):
+        if method == "pde":
+            return FiniteDifferencePricer.price_barrier(
+                type_option=self.type_option,
+                spot=self.spot,
+                strike=self.strike,
+                maturity=self.maturity,
+                rate=self.rate,
+                volatility=self.volatility,
+                dividend_yield=self.dividend_yield,
+                barrier_level=self.barrier_level,
+                barrier_type=self.barrier_type,
+                rebate=self.rebate
+            )["Price"]
+        elif method == "analytic":
+            return float(ClosedFormPricer.price_barrier(**self._closed_form_args()))
+        elif method != "monte_carlo":
+            raise ValueError("method doit être 'monte_carlo', 'pde' ou 'analytic'.")
+
         return MonteCarloPricer.price_barrier(
             type_option=self.type_option,
             spot=self.spot,
@@ -33,7 +70,7 @@ class BarrierOption(ExoticOption):
             time_steps=time_steps
         )
     
-    def price2(self, steps=500):
+    def price2(self, steps=500, lattice="interpolated"):
         return BinomialTreePricer.price_barrier_binomial(
             type_option=self.type_option,
             spot=self.spot,
@@ -45,11 +82,19 @@ class BarrierOption(ExoticOption):
             barrier_level=self.barrier_level,
             barrier_type=self.barrier_type,
             rebate=self.rebate,
-            steps= steps        )
+            steps= steps,
+            lattice=lattice        )
 
     
-    def greek(self, steps=500):
-        return BinomialTreeGreek.binomial_barrier_greeks(
+    def greek(self, steps=500, lattice="interpolated", method="tree"):
+        """Grecques de la barrière, Theta en dV/dt (temps calendaire) quelle que soit method."""
+        if method == "analytic":
+            greeks = ClosedFormGreek.barrier_greeks(**self._closed_form_args())
+            return {key: float(greeks[key]) for key in ("Delta", "Gamma", "Vega", "Theta", "Rho")}
+        elif method != "tree":
+            raise ValueError("method doit être 'tree' ou 'analytic'.")
+
+        greeks = BinomialTreeGreek.binomial_barrier_greeks(
             S=self.spot,
             K=self.strike,
             T=self.maturity,
@@ -60,5 +105,9 @@ class BarrierOption(ExoticOption):
             barrier_level=self.barrier_level,
             barrier_type=self.barrier_type,
             rebate=self.rebate,
-            steps=steps
-        )
\ No newline at end of file
+            steps=steps,
+            lattice=lattice
+        )
+        # L'arbre renvoie dV/dT
+        greeks["Theta"] = -greeks["Theta"]
+        return greeks
@@ -2,8 +2,8 @@
 # digits_options.py
 
 import numpy as np
-from scipy.stats import norm
 from option_models.option import Option  
+from pricing_method.black_scholes import BlackScholesPricer
 from greek_method.black_scholes_greek import DigitGreek
 
 
@@ -21,30 +21,49 @@ class DigitOption(Option):
 
 
     def price(self):
-
-        d2 = (np.log(self.spot / self.strike) + (self.rate - 0.5 * self.volatility**2) * self.maturity) / (self.volatility * np.sqrt(self.maturity))
-        base_price = self.cash_payout * np.exp(-self.rate * self.maturity)
-
-        if self.type_option == "call":
-            price = base_price * norm.cdf(d2)
-        elif self.type_option == "put":
-            price = base_price * (1 - norm.cdf(d2))
-        else:
-            raise ValueError("type_option doit être 'call' ou 'put'.")
-
-        # Gestion des barrières
-        if self.barrier:
-            if self.barrier_type == "up" and self.spot >= self.barrier:
-                return 0.0  # Barrière franchie, option sans valeur
-            elif self.barrier_type == "down" and self.spot <= self.barrier:
-                return 0.0  # Barrière franchie, option sans valeur
-
-        return price
-
-
+        return float(BlackScholesPricer.price_digital(
+            S=self.spot,
+            K=self.strike,
+            T=self.maturity,
+            r=self.rate,
+            sigma=self.volatility,
+            q=self.dividend_yield,
+            cash_payout=self.cash_payout,
+            option_type=self.type_option,
+            barrier=self.barrier,
+            barrier_type=self.barrier_type
+        ))
+
+    def _strip_args(self, strikes, maturities):
+        # Grille (maturité x strike) : lignes = maturités, colonnes = strikes
+        strikes = np.atleast_1d(self.strike if strikes is None else strikes).astype(float)
+        maturities = np.atleast_1d(self.maturity if maturities is None else maturities).astype(float)
+        return dict(
+            S=self.spot,
+            K=strikes[None, :],
+            T=maturities[:, None],
+            r=self.rate,
+            sigma=self.volatility,
+            q=self.dividend_yield
+        )
+
+    def price_strip(self, strikes=None, maturities=None):
+        """Prix sur toute une grille (maturités x strikes) en un appel."""
+        return BlackScholesPricer.price_digital(
+            **self._strip_args(strikes, maturities), cash_payout=self.cash_payout,
+            option_type=self.type_option, barrier=self.barrier, barrier_type=self.barrier_type)
+
+    def proba_ITM_strip(self, strikes=None, maturities=None):
+        return BlackScholesPricer.proba_itm(**self._strip_args(strikes, maturities), option_type=self.type_option)
+
+    def greek_strip(self, strikes=None, maturities=None):
+        """Grecs en colonnes de forme (maturités x strikes)."""
+        return DigitGreek.bs_greeks_digit(
+            **self._strip_args(strikes, maturities), cash_payout=self.cash_payout,
+            type_option=self.type_option, barrier=self.barrier, barrier_type=self.barrier_type)
 
     def greek(self):
-        return DigitGreek.bs_greeks_digit(
+        greeks = DigitGreek.bs_greeks_digit(
         S=self.spot,
         K=self.strike,
         T=self.maturity,
@@ -56,6 +75,7 @@ class DigitOption(Option):
         barrier=self.barrier,
         barrier_type=self.barrier_type
     )
+        return {key: float(value) for key, value in greeks.items()}
 
 
     def payoff(self):
@@ -67,13 +87,8 @@ class DigitOption(Option):
             raise ValueError("type_option doit être 'call' ou 'put'.")
 
     def proba_ITM(self):
-        d2 = (np.log(self.spot / self.strike) + (self.rate - 0.5 * self.volatility**2) * self.maturity) / (self.volatility * np.sqrt(self.maturity))
-        if self.type_option == "call":
-            return norm.cdf(d2)
-        elif self.type_option == "put":
-            return norm.cdf(-d2)
-        else:
-            raise ValueError("type_option doit être 'call' ou 'put'.")
+        return float(BlackScholesPricer.proba_itm(
+            self.spot, self.strike, self.maturity, self.rate, self.volatility, self.dividend_yield, self.type_option))
         
     def expected_payoff(self):
         probability_in_the_money = self.proba_ITM()  # Probabilité que l'option soit dans la monnaie
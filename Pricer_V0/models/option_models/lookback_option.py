@@ -3,7 +3,9 @@
 
 from option_models.exotic_option import ExoticOption  
 from pricing_method.monte_carlo import MonteCarloPricer
+from pricing_method.closed_form import ClosedFormPricer
 from greek_method.monte_carlo_greek import MonteCarloGreek
+from greek_method.closed_form_greek import ClosedFormGreek
 
 class LookbackOption(ExoticOption):
     def __init__(self, strike_type: str, min_price_observed=None, max_price_observed=None, **kwargs):
@@ -16,8 +18,28 @@ class LookbackOption(ExoticOption):
         self.min_price_observed = min_price_observed
         self.max_price_observed = max_price_observed
 
-    def price(self, num_paths=100000, time_steps=100):
-        
+    def _closed_form_args(self):
+        # Formules fermées (GBM), correction BGK si num_observations est renseigné
+        return dict(
+            type_option=self.type_option,
+            spot=self.spot,
+            strike=self.strike,
+            maturity=self.maturity,
+            rate=self.rate,
+            volatility=self.volatility,
+            dividend_yield=self.dividend_yield,
+            strike_type=self.strike_type,
+            min_price_observed=self.min_price_observed,
+            max_price_observed=self.max_price_observed,
+            num_observations=self.num_observations
+        )
+
+    def price(self, num_paths=100000, time_steps=100, method="analytic"):
+        if method == "analytic":
+            return float(ClosedFormPricer.price_lookback(**self._closed_form_args()))
+        elif method != "monte_carlo":
+            raise ValueError("method doit être 'analytic' ou 'monte_carlo'.")
+
         return MonteCarloPricer.price_lookback(
             type_option=self.type_option,
             spot=self.spot,
@@ -32,8 +54,15 @@ class LookbackOption(ExoticOption):
         )
 
 
-    def greek(self, num_paths=100_000, time_steps=100, seed=None):
-        return MonteCarloGreek.montecarlo_lookback_greeks(
+    def greek(self, num_paths=100_000, time_steps=100, seed=None, method="analytic"):
+        """Grecques de la lookback, Theta en dV/dt (temps calendaire) quelle que soit method."""
+        if method == "analytic":
+            greeks = ClosedFormGreek.lookback_greeks(**self._closed_form_args())
+            return {key: float(greeks[key]) for key in ("Delta", "Gamma", "Vega", "Theta", "Rho")}
+        elif method != "monte_carlo":
+            raise ValueError("method doit être 'analytic' ou 'monte_carlo'.")
+
+        greeks = MonteCarloGreek.montecarlo_lookback_greeks(
             type_option=self.type_option,
             spot=self.spot,
             strike=self.strike,
@@ -46,5 +75,8 @@ class LookbackOption(ExoticOption):
             time_steps=time_steps,
             seed=seed
         )
+        # L'estimateur Monte Carlo renvoie dV/dT
+        greeks["Theta"] = -greeks["Theta"]
+        return greeks
 
             
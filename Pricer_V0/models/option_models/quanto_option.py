@@ -45,5 +45,6 @@ class QuantoOption(Option):
             q=self.dividend_yield,
             fx_rate_volatility=self.fx_rate_volatility,
             fx_correlation=self.fx_correlation,
-            option_type=self.type_option
+            option_type=self.type_option,
+            asset_volatility=self.volatility
         )
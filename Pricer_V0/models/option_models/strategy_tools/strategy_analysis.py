@@ -1,37 +1,21 @@
 # strategy_analysis.py
+import numpy as np
 from pricing_method.black_scholes import BlackScholesPricer
 from greek_method.black_scholes_greek import BlackScholesGreek
 
 def price_strategy(options):
 
-    total_price = 0
-    for option in options:
-        price = BlackScholesPricer.price(
-            S=option['spot'],
-            K=option['strike'],
-            T=option['maturity'],
-            r=option['rate'],
-            sigma=option['volatility'],
-            q=option['dividend_yield'],
-            option_type=option['type_option']
-        )
-        total_price += price * option['quantity']
-    return total_price
+    # Toutes les jambes sont pricées en un seul appel vectorisé
+    fields = ('spot', 'strike', 'maturity', 'rate', 'volatility', 'dividend_yield', 'type_option', 'quantity')
+    S, K, T, r, sigma, q, option_type, quantity = ([option[field] for option in options] for field in fields)
+    prices = BlackScholesPricer.price(S=S, K=K, T=T, r=r, sigma=sigma, q=q, option_type=option_type)
+    return float(np.dot(prices, quantity))
 
 
 def greeks_strategy(strategy_type, options):
 
-    combined_greeks = {"Delta": 0, "Gamma": 0, "Vega": 0, "Theta": 0, "Rho": 0}
-    for option in options:
-        greeks = BlackScholesGreek.bs_greeks(
-            S=option['spot'],
-            K=option['strike'],
-            T=option['maturity'],
-            r=option['rate'],
-            sigma=option['volatility'],
-            q=option['dividend_yield'],
-            option_type=option['type_option']
-        )
-        for key in combined_greeks:
-            combined_greeks[key] += greeks[key] * option['quantity']
-    return combined_greeks
+    # Grecs de toutes les jambes en un seul appel, pondérés par les quantités
+    fields = ('spot', 'strike', 'maturity', 'rate', 'volatility', 'dividend_yield', 'type_option', 'quantity')
+    S, K, T, r, sigma, q, option_type, quantity = ([option[field] for option in options] for field in fields)
+    greeks = BlackScholesGreek.bs_price_greeks(S=S, K=K, T=T, r=r, sigma=sigma, q=q, option_type=option_type)
+    return {key: float(np.dot(greeks[key], quantity)) for key in ("Delta", "Gamma", "Vega", "Theta", "Rho")}
@@ -2,6 +2,7 @@
 from option_models.option import Option  
 from pricing_method.black_scholes import BlackScholesPricer 
 from pricing_method.binomial_tree import BinomialTreePricer 
+from pricing_method.finite_difference import FiniteDifferencePricer
 from greek_method.black_scholes_greek import BlackScholesGreek
 from greek_method.binomial_tree_greek import BinomialTreeGreek
 
@@ -14,7 +15,7 @@ class VanillaOption(Option):
         
         self.type_exercise = type_exercise
 
-    def price(self, steps=100):
+    def price(self, steps=100, tol=None, method="tree"):
         if self.type_exercise == "European":
             return BlackScholesPricer.price(
                 S=self.spot,
@@ -27,6 +28,30 @@ class VanillaOption(Option):
         
         
         elif self.type_exercise == "American":
+            # method="pde" : grille de Crank-Nicolson au lieu de l'arbre
+            if method == "pde":
+                return FiniteDifferencePricer.price_vanilla(
+                    S=self.spot,
+                    K=self.strike,
+                    T=self.maturity,
+                    r=self.rate,
+                    sigma=self.volatility,
+                    q=self.dividend_yield,
+                    option_type=self.type_option,
+                    american=True
+                )["Price"]
+            # tol : précision cible, atteinte par l'arbre accéléré (BBSR)
+            if tol is not None:
+                return BinomialTreePricer.price_vanilla_american_tol(
+                    S=self.spot,
+                    K=self.strike,
+                    T=self.maturity,
+                    r=self.rate,
+                    sigma=self.volatility,
+                    q=self.dividend_yield,
+                    option_type=self.type_option,
+                    tol=tol
+                )
             return BinomialTreePricer.price_vanilla_american(
                 S=self.spot,
                 K=self.strike,
@@ -35,7 +60,8 @@ class VanillaOption(Option):
                 sigma=self.volatility,
                 q=self.dividend_yield,
                 option_type=self.type_option,
-                steps=steps
+                steps=steps,
+                american=True
             )
         else:
             raise ValueError("Type d'exercice non supporté.")
@@ -2,154 +2,444 @@
 #binomial_tree.py
 
 import math
+import warnings
+from collections import namedtuple
+from functools import lru_cache
 import numpy as np
+from scipy.interpolate import CubicSpline
+from pricing_method.black_scholes import BlackScholesPricer
+
+# Géométrie d'un arbre CRR indépendante du spot et du strike : les noeuds de
+# l'étape i (j baisses) valent spot * powers[steps + i - 2j]
+LatticeGeometry = namedtuple("LatticeGeometry", [
+    "dt", "u", "d", "p", "p_up", "p_down", "powers", "discount_factors", "observation_mask"])
+
 
 class BinomialTreePricer:
     @staticmethod
-    def price_vanilla_american(S, K, T, r, sigma, q=0, option_type="call", steps=500, american=False): 
+    @lru_cache(maxsize=256)
+    def lattice_geometry(sigma, T, r, q, steps, frequency=None):
+        """Géométrie CRR mémoïsée par (sigma, T, r, q, steps, fréquence d'observation).
+
+        powers : u^k pour k = -steps..steps (spot normalisé à 1) ;
+        discount_factors : exp(-r * i * dt) ; observation_mask : étapes
+        d'observation de la fréquence donnée (None si pas d'échéancier).
+        Compteurs : BinomialTreePricer.lattice_geometry.cache_info().
+        """
         dt = T / steps
         u = math.exp(sigma * math.sqrt(dt))
         d = 1 / u
         p = (math.exp((r - q) * dt) - d) / (u - d)
 
+        # Probabilités actualisées d'une étape
+        p_up = math.exp(-r * dt) * p
+        p_down = math.exp(-r * dt) * (1 - p)
+
+        powers = u ** np.arange(-steps, steps + 1)
+        discount_factors = np.exp(-r * dt * np.arange(steps + 1))
+        observation_mask = None
+        if frequency is not None:
+            observation_mask = np.zeros(steps + 1, dtype=bool)
+            observation_mask[BinomialTreePricer.calculate_observation_dates(T, frequency, dt, steps)] = True
+            observation_mask.setflags(write=False)
+
+        # Partagés entre appels : en lecture seule
+        powers.setflags(write=False)
+        discount_factors.setflags(write=False)
+        return LatticeGeometry(dt, u, d, p, p_up, p_down, powers, discount_factors, observation_mask)
+
+    @staticmethod
+    def price_vanilla_american(S, K, T, r, sigma, q=0, option_type="call", steps=500, american=False): 
+        price, _ = BinomialTreePricer._vanilla_rollback(S, K, T, r, sigma, q, option_type, steps, american)
+        return price
+
+    @staticmethod
+    def price_vanilla_american_bbsr(S, K, T, r, sigma, q=0, option_type="call", steps=100, american=True):
+        """Arbre BBSR : dernière étape lissée par Black-Scholes (BBS) puis
+        extrapolation de Richardson sur steps et steps // 2 étapes."""
+        if steps < 2:
+            raise ValueError("steps doit être au moins 2 : l'arbre grossier a steps // 2 étapes.")
+        price_fine, _ = BinomialTreePricer._vanilla_rollback(
+            S, K, T, r, sigma, q, option_type, steps, american, black_scholes_step=True)
+        price_coarse, _ = BinomialTreePricer._vanilla_rollback(
+            S, K, T, r, sigma, q, option_type, steps // 2, american, black_scholes_step=True)
+        return 2 * price_fine - price_coarse
+
+    @staticmethod
+    def price_vanilla_american_tol(S, K, T, r, sigma, q=0, option_type="call", tol=1e-3, steps=64, max_steps=4096, american=True):
+        """Double le nombre d'étapes du BBSR jusqu'à ce que l'erreur estimée passe sous tol.
+
+        La convergence du BBSR oscille : un écart isolé entre deux prix
+        successifs peut s'annuler par hasard. L'erreur est estimée par le plus
+        grand des deux derniers écarts, avec un facteur de sécurité de 2.
+        Avertit (RuntimeWarning) si max_steps est atteint avant tol.
+        """
+        prices = [BinomialTreePricer.price_vanilla_american_bbsr(S, K, T, r, sigma, q, option_type, steps, american)]
+        while steps < max_steps:
+            steps *= 2
+            prices.append(BinomialTreePricer.price_vanilla_american_bbsr(S, K, T, r, sigma, q, option_type, steps, american))
+            if len(prices) >= 3 and max(abs(prices[-1] - prices[-2]), abs(prices[-2] - prices[-3])) < tol / 2:
+                return prices[-1]
+        warnings.warn(f"Précision {tol} non atteinte en {steps} étapes (max_steps).", RuntimeWarning)
+        return prices[-1]
+
+    @staticmethod
+    def price_vanilla_american_chain(S, K, T, r, sigma, q=0, option_type="call", steps=500):
+        """Prix américains d'une chaîne de strikes et/ou d'une échelle de spots.
+
+        Le prix étant homogène en (S, K), un seul arbre normalisé (K = 1) par
+        (r, q, sigma, T, steps) est déroulé puis mis en cache ; chaque point est
+        obtenu par interpolation en log-moneyness. À 500 étapes, l'écart à un
+        arbre de 5000 étapes atteint 1e-2 environ (K ~ 100, sigma sqrt(T) ~ 0.35).
+        """
+        S, K = np.broadcast_arrays(np.asarray(S, dtype=float), np.asarray(K, dtype=float))
+        spline, bounds, _, _ = BinomialTreePricer._american_grid(
+            float(r), float(q), float(sigma), float(T), int(steps), option_type)
+
+        moneyness = np.log(S / K)
+        inside = (moneyness >= bounds[0]) & (moneyness <= bounds[1])
+        # Hors de la grille : valeur intrinsèque côté dans la monnaie (exercice), 0 sinon
+        sign = 1.0 if option_type == "call" else -1.0
+        normalized = np.where(inside, spline(np.clip(moneyness, *bounds)),
+                              np.maximum(sign * (np.exp(moneyness) - 1.0), 0.0))
+        return K * normalized
+
+    @staticmethod
+    def exercise_boundary(T, r, sigma, q=0, option_type="call", steps=500):
+        """Frontière d'exercice normalisée S*/K à chaque date de l'arbre (NaN sans exercice)."""
+        _, _, times, boundary = BinomialTreePricer._american_grid(
+            float(r), float(q), float(sigma), float(T), int(steps), option_type)
+        return times, boundary
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _american_grid(r, q, sigma, T, steps, option_type):
+        # Arbre normalisé (S = K = 1) démarré steps étapes avant t = 0 : l'étape
+        # steps porte à t = 0 les log-moneyness (steps - 2j) * ln(u), j = 0..steps
+        dt = T / steps
+        log_u = sigma * math.sqrt(dt)
+        boundary = np.full(2 * steps + 1, np.nan)
+        _, layer = BinomialTreePricer._vanilla_rollback(
+            1.0, 1.0, 2 * T, r, sigma, q, option_type, 2 * steps, american=True,
+            snapshot_step=steps, exercise_boundary=boundary)
+
+        moneyness = (steps - 2 * np.arange(steps + 1)) * log_u
+        spline = CubicSpline(moneyness[::-1], layer[::-1])
+
+        # Frontière aux dates t = 0..T (étapes steps à 2 * steps de l'arbre) ; à
+        # maturité on exerce dès que l'option est dans la monnaie
+        times = dt * np.arange(steps + 1)
+        boundary = boundary[steps:]
+        boundary[-1] = 1.0
+        times.setflags(write=False)
+        boundary.setflags(write=False)
+        return spline, (moneyness[-1], moneyness[0]), times, boundary
+
+    @staticmethod
+    def _vanilla_rollback(S, K, T, r, sigma, q, option_type, steps, american, snapshot_step=None, black_scholes_step=False,
+                          exercise_boundary=None):
+        # Renvoie le prix à la racine et, si demandé, une copie des valeurs des
+        # noeuds de l'étape snapshot_step (S * u^(i - 2j), j = 0..i).
+        # black_scholes_step : la dernière étape est remplacée par le prix
+        # européen Black-Scholes sur dt (arbre BBS)
+        # exercise_boundary : tableau (steps + 1) rempli, pour chaque étape, du
+        # spot critique d'exercice (le plus haut pour un put, le plus bas pour un call)
+        geometry = BinomialTreePricer.lattice_geometry(sigma, T, r, q, steps)
+        dt, p, p_up, p_down = geometry.dt, geometry.p, geometry.p_up, geometry.p_down
+
         if not (0 <= p <= 1):
             raise ValueError(f"Probabilité neutre au risque invalide : p={p}")
 
-        prices = np.zeros((steps + 1, steps + 1))
-        prices[0, 0] = S
+        # Puissances u^k pour k = -steps..steps : les noeuds de l'étape i (j baisses)
+        # valent S * u^(i - 2j), soit une tranche de pas 2 de ce vecteur
+        powers = S * geometry.powers
+        sign = 1.0 if option_type == "call" else -1.0
+
+        # Un seul vecteur de valeurs (plus un tampon), réutilisé à chaque étape
+        values = np.maximum(sign * (powers[::2][::-1] - K), 0.0)
+        buffer = np.empty(steps + 1)
+        snapshot = None
+        last_step = steps
+
+        if black_scholes_step:
+            last_step = steps - 1
+            spots = powers[1:2 * steps:2][::-1]
+            values[:steps] = BlackScholesPricer.price(spots, K, dt, r, sigma, q, option_type)
+            if american:
+                np.maximum(values[:steps], sign * (spots - K), out=values[:steps])
+
+        for i in range(last_step - 1, -1, -1):
+            n = i + 1
+            np.multiply(values[1:n + 1], p_down, out=buffer[:n])
+            values[:n] *= p_up
+            values[:n] += buffer[:n]
+
+            if american:
+                # Noeuds de l'étape i : S * u^(i - 2j), j = 0..i
+                spots = powers[steps - i:steps + i + 1:2][::-1]
+                np.subtract(spots, K, out=buffer[:n])
+                buffer[:n] *= sign
+                if exercise_boundary is not None:
+                    exercised = (buffer[:n] > values[:n]) & (buffer[:n] > 0)
+                    if exercised.any():
+                        exercise_boundary[i] = spots[exercised].max() if sign < 0 else spots[exercised].min()
+                np.maximum(values[:n], buffer[:n], out=values[:n])
+
+            if i == snapshot_step:
+                snapshot = values[:n].copy()
+
+        return values[0], snapshot
+
+    @staticmethod
+    def price_vanilla_american_batch(S, K, T, r, sigma, q=0, option_type="call", steps=500, american=True):
+        """Price un lot de vanilles sur des arbres CRR déroulés ensemble (noeud x contrat).
+
+        Tous les paramètres acceptent des tableaux (ou des scalaires diffusés) ;
+        option_type est un tableau de "call"/"put" ou de booléens (True = call).
+        """
+        S, K, T, r, sigma, q, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)),
+            BlackScholesPricer._call_flags(option_type))
+        prices, _ = BinomialTreePricer._vanilla_batch_rollback(
+            *(x.ravel() for x in (S, K, T, r, sigma, q, is_call)), steps, american)
+        return prices.reshape(S.shape)
+
+    @staticmethod
+    def _vanilla_batch_rollback(S, K, T, r, sigma, q, is_call, steps, american, snapshot_step=None):
+        # Version par lot de _vanilla_rollback (paramètres 1-D de même longueur) ;
+        # le snapshot est de forme (snapshot_step + 1, contrats)
+
+        dt = T / steps
+        u = np.exp(sigma * np.sqrt(dt))
+        d = 1 / u
+        p = (np.exp((r - q) * dt) - d) / (u - d)
+
+        invalid = (p < 0) | (p > 1)
+        if np.any(invalid):
+            raise ValueError(f"Probabilité neutre au risque invalide : p={p[invalid]}")
 
-        for i in range(1, steps + 1):
-            prices[i, 0] = prices[i-1, 0] * u
-            for j in range(1, i + 1):
-                prices[i, j] = prices[i-1, j-1] * d
+        p_up = np.exp(-r * dt) * p
+        p_down = np.exp(-r * dt) * (1 - p)
 
-        option_values = np.zeros((steps + 1, steps + 1))
-        for j in range(steps + 1):
-            if option_type == "call":
-                option_values[steps, j] = max(0, prices[steps, j] - K)
-            elif option_type == "put":
-                option_values[steps, j] = max(0, K - prices[steps, j])
+        # Disposition (noeud x contrat) : chaque tranche de noeuds est contiguë.
+        # Ligne k : S * u^k pour k = -steps..steps
+        powers = S * u ** np.arange(-steps, steps + 1)[:, None]
+        sign = np.where(is_call, 1.0, -1.0)
+
+        values = np.maximum(sign * (powers[::2][::-1] - K), 0.0)
+        buffer = np.empty_like(values)
+        snapshot = None
 
         for i in range(steps - 1, -1, -1):
-            for j in range(i + 1):
-                continuation_value = math.exp(-r * dt) * (p * option_values[i+1, j] + (1 - p) * option_values[i+1, j+1])
-                if option_type == "call":
-                    intrinsic_value = max(0, prices[i, j] - K)
-                else:  # put
-                    intrinsic_value = max(0, K - prices[i, j])
-
-                if american:
-                    option_values[i, j] = max(continuation_value, intrinsic_value)
-                else:
-                    option_values[i, j] = continuation_value
+            n = i + 1
+            np.multiply(values[1:n + 1], p_down, out=buffer[:n])
+            values[:n] *= p_up
+            values[:n] += buffer[:n]
+
+            if american:
+                spots = powers[steps - i:steps + i + 1:2][::-1]
+                np.subtract(spots, K, out=buffer[:n])
+                buffer[:n] *= sign
+                np.maximum(values[:n], buffer[:n], out=values[:n])
+
+            if i == snapshot_step:
+                snapshot = values[:n].copy()
 
-        return option_values[0, 0]
+        return values[0].copy(), snapshot
 
     @staticmethod
     def price_barrier_binomial(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
         barrier_level, barrier_type, rebate=0.0,
-        steps=200):
-
-        # Initialisation des paramètres de l'arbre binomial
-        dt = maturity / steps
-        u = np.exp(volatility * np.sqrt(dt))  # Facteur de hausse
-        d = 1 / u                             # Facteur de baisse
-        p = (np.exp((rate - dividend_yield) * dt) - d) / (u - d)  # Probabilité neutre au risque
-        
-        # Initialisation des matrices pour les prix du sous-jacent et les payoffs
-        prices = np.zeros((steps + 1, steps + 1))
-        prices[0, 0] = spot
-
-        for i in range(1, steps + 1):
-            for j in range(i + 1):
-                prices[j, i] = spot * (u ** (i - j)) * (d ** j)
-
-        # Calcul des payoffs à maturité (vanilla)
-        payoffs = np.zeros(steps + 1)
+        steps=200, lattice="crr"):
+        """Price une option barrière sur un arbre CRR vectorisé.
+
+        lattice : "crr" (barrière sur la première couche de noeuds franchie),
+        "aligned" (nombre d'étapes choisi pour que la barrière tombe sur une
+        couche de noeuds, Boyle-Lau) ou "interpolated" (interpolation entre les
+        deux couches qui encadrent la barrière, Derman-Kani-Ergener-Bardhan).
+        """
+        values, _ = BinomialTreePricer.barrier_binomial_nodes(
+            type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+            barrier_level, barrier_type, rebate, steps, lattice)
+        return values[0]
+
+    @staticmethod
+    def barrier_binomial_nodes(
+        type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+        barrier_level, barrier_type, rebate=0.0,
+        steps=200, lattice="crr", extra_steps=0):
+        """Valeurs d'une barrière aux extra_steps + 1 noeuds de t = 0.
+
+        L'arbre est enraciné extra_steps étapes avant t = 0 au spot, avec le
+        même pas dt : à t = 0 ses noeuds valent spot * u^(extra_steps - 2j)
+        et le noeud central (extra_steps pair) porte le prix. La barrière
+        n'est active qu'à partir de t = 0. Renvoie (valeurs, spots des
+        noeuds), du noeud le plus haut au plus bas.
+        """
+        if lattice not in ("crr", "aligned", "interpolated"):
+            raise ValueError("lattice doit être 'crr', 'aligned' ou 'interpolated'.")
+
+        up = "up" in barrier_type
+        if lattice == "aligned":
+            steps = BinomialTreePricer._aligned_barrier_steps(spot, maturity, volatility, barrier_level, steps)
+
+        # Paramètres de l'arbre binomial (géométrie mémoïsée)
+        geometry = BinomialTreePricer.lattice_geometry(
+            volatility, maturity * (steps + extra_steps) / steps, rate, dividend_yield, steps + extra_steps)
+        u = geometry.u  # Facteur de hausse
+
+        # Position de la barrière en puissances de u : couche franchie (out) et
+        # dernière couche non franchie (in)
+        level = math.log(barrier_level / spot) / math.log(u)
+        if up:
+            layer_out = math.ceil(level - 1e-9)
+            layer_in = layer_out - 1
+        else:
+            layer_out = math.floor(level + 1e-9)
+            layer_in = layer_out + 1
+
+        layers = [layer_out, layer_in] if lattice == "interpolated" else [layer_out]
+        values = BinomialTreePricer._barrier_rollback(
+            type_option, spot, strike, geometry, steps + extra_steps,
+            up, "in" in barrier_type, rebate, layers, extra_steps)
+        spots = spot * u ** (extra_steps - 2.0 * np.arange(extra_steps + 1))
+
+        if lattice == "interpolated":
+            barrier_out = spot * u ** layer_out
+            barrier_in = spot * u ** layer_in
+            weight = (barrier_level - barrier_in) / (barrier_out - barrier_in)
+            return values[1] + weight * (values[0] - values[1]), spots
+        return values[0], spots
+
+    @staticmethod
+    def _aligned_barrier_steps(spot, maturity, volatility, barrier_level, steps):
+        # Boyle-Lau : N(k) = floor(k² sigma² T / ln(S/B)²) place la barrière sur la
+        # couche k ; on retient le plus grand N(k) ne dépassant pas steps
+        distance = abs(math.log(spot / barrier_level))
+        if distance == 0:
+            return steps
+        k = math.floor(distance * math.sqrt(steps / (volatility**2 * maturity)))
+        while k > 0:
+            aligned = math.floor(k**2 * volatility**2 * maturity / distance**2)
+            if 0 < aligned <= steps:
+                return aligned
+            k -= 1
+        return steps
+
+    @staticmethod
+    def _barrier_rollback(type_option, spot, strike, geometry, steps,
+                          up, knock_in, rebate, layers, start_step=0):
+        # Déroule ensemble, pour chaque couche-barrière, les lignes nécessaires :
+        # knock-out -> [KO avec rebate] ;
+        # knock-in  -> [vanille] + [KO sans rebate, probabilité de survie]
+        # (parité in/out, le rebate d'un knock-in étant payé à maturité).
+        # La barrière est active à partir de start_step, dont les valeurs aux
+        # noeuds sont renvoyées pour chaque couche
+        terminal_spots = spot * geometry.powers[::2][::-1]
         if "call" in type_option:
-            payoffs = np.maximum(prices[:, steps] - strike, 0.0)
+            vanilla = np.maximum(terminal_spots - strike, 0.0)
         else:
-            payoffs = np.maximum(strike - prices[:, steps], 0.0)
+            vanilla = np.maximum(strike - terminal_spots, 0.0)
+
+        if knock_in:
+            rows = [vanilla] + [row for _ in layers for row in (vanilla, np.ones(steps + 1))]
+            knocked_values = [0.0] + [0.0, 0.0] * len(layers)
+            first_row, rows_per_layer = 1, 2
+        else:
+            rows = [vanilla] * len(layers)
+            knocked_values = [rebate] * len(layers)
+            first_row, rows_per_layer = 0, 1
+        values = np.array(rows)
+        knocked_values = np.array(knocked_values)[:, None]
+
+        # Masque de knock par tranche : nombre de noeuds franchis à l'étape i
+        # (préfixe des noeuds hauts pour "up", suffixe des noeuds bas pour "down")
+        i = np.arange(steps + 1)
+        knock_counts = []
+        for layer in layers:
+            if up:
+                counts = np.floor_divide(i - layer, 2) + 1
+            else:
+                counts = i + 1 - (-np.floor_divide(layer - i, 2))
+            knock_counts.append(np.clip(counts, 0, i + 1))
+
+        def apply_knock(step):
+            n = step + 1
+            for index, counts in enumerate(knock_counts):
+                rows_slice = slice(first_row + index * rows_per_layer, first_row + (index + 1) * rows_per_layer)
+                m = counts[step]
+                if m == 0:
+                    continue
+                if up:
+                    values[rows_slice, :m] = knocked_values[rows_slice]
+                else:
+                    values[rows_slice, n - m:n] = knocked_values[rows_slice]
+
+        p_up, p_down = geometry.p_up, geometry.p_down
+        buffer = np.empty_like(values)
 
         # Backward induction en tenant compte de la barrière
-        for i in range(steps - 1, -1, -1):
-            for j in range(i + 1):
-                # Actualisation des payoffs
-                payoffs[j] = np.exp(-rate * dt) * (p * payoffs[j] + (1 - p) * payoffs[j + 1])
-
-                # Condition de barrière (knock-in / knock-out)
-                if "up" in barrier_type and prices[j, i] >= barrier_level:
-                    if "in" in barrier_type:
-                        payoffs[j] = payoffs[j]  # Knock-in : conserver le payoff
-                    else:
-                        payoffs[j] = rebate     # Knock-out : appliquer le rebate
-                elif "down" in barrier_type and prices[j, i] <= barrier_level:
-                    if "in" in barrier_type:
-                        payoffs[j] = payoffs[j]  # Knock-in : conserver le payoff
-                    else:
-                        payoffs[j] = rebate     # Knock-out : appliquer le rebate
-
-        # Retourner le prix de l'option
-        return payoffs[0]
+        apply_knock(steps)
+        for step in range(steps - 1, start_step - 1, -1):
+            n = step + 1
+            np.multiply(values[:, 1:n + 1], p_down, out=buffer[:, :n])
+            values[:, :n] *= p_up
+            values[:, :n] += buffer[:, :n]
+            apply_knock(step)
+
+        prices = values[:, :start_step + 1]
+        if knock_in:
+            knocked_out = prices[first_row::rows_per_layer]
+            survival = prices[first_row + 1::rows_per_layer]
+            return prices[0] - knocked_out + rebate * survival
+        return prices
 
     @staticmethod
     def price_autocall(spot, strike, maturity, rate, volatility, dividend_yield,
                        coupon, barrier, protection_barrier,
                        type_autocall='athena', frequency_per_year= "'semi-annual'", steps=500, memory_feature=True):
   
-        dt = maturity / steps
-        u = np.exp(volatility * np.sqrt(dt))
-        d = 1 / u
-        p = (np.exp((rate - dividend_yield) * dt) - d) / (u - d)
+        # Géométrie mémoïsée : masque des étapes d'observation et actualisation
+        # depuis chaque étape inclus
+        geometry = BinomialTreePricer.lattice_geometry(volatility, maturity, rate, dividend_yield, steps, frequency_per_year)
+        p, p_up, p_down = geometry.p, geometry.p_up, geometry.p_down
+        observation_mask = geometry.observation_mask
+        discount_factors = geometry.discount_factors
+
+        # Noeuds de l'étape i : spot * u^(i - 2j), tranche de pas 2 de ce vecteur
+        powers = spot * geometry.powers
 
-        # Construction de l'arbre des prix
-        prices = np.zeros((steps + 1, steps + 1))
-        for i in range(steps + 1):
-            for j in range(i + 1):
-                prices[j, i] = spot * (u ** (i - j)) * (d ** j)
+        # Seule la mémoire d'un phenix intervient dans le payoff
+        track_memory = memory_feature and type_autocall == 'phenix'
 
-        # Initialisation des payoffs et mémoire des coupons
-        payoffs = np.zeros(steps + 1)
-        coupon_memory = [0] * (steps + 1) if memory_feature else None
+        # Échéance finale
+        terminal_spots = powers[::2][::-1]
+        payoffs = np.where(terminal_spots < protection_barrier, terminal_spots / spot, 1.0)
+        coupon_memory = np.zeros(steps + 1) if track_memory else None
+        buffer = np.empty(steps + 1)
 
-        # Calcul des dates d'observation
-        observation_dates = BinomialTreePricer.calculate_observation_dates(maturity, frequency_per_year, dt, steps)
-        
         # Backward induction
-        for i in range(steps, -1, -1):
-            t = i * dt
-            discount_factor = np.exp(-rate * t)  # Calculé une seule fois par étape
-            df_step = np.exp(-rate * dt)  # Facteur d'actualisation pour une étape
-
-            if i == steps:  # Échéance finale
-                for j in range(i + 1):
-                    payoffs[j] = prices[j, i] / spot if prices[j, i] < protection_barrier else 1.0
-                continue
-
-            new_payoffs = np.zeros(i + 1)
-            new_coupon_memory = [0] * (i + 1) if memory_feature else None
-
-            for j in range(i + 1):
-                continuation = df_step * (p * payoffs[j] + (1 - p) * payoffs[j + 1])
-                
-                if i in observation_dates:
-                    current_coupon_mem = coupon_memory[j] if memory_feature else None
-                    payoff_val, new_coupon = BinomialTreePricer.calculate_payoff(
-                        prices[j, i], continuation, coupon, barrier, discount_factor,
-                        type_autocall, memory_feature, current_coupon_mem
-                    )
-                    new_payoffs[j] = payoff_val
-                    if memory_feature:
-                        new_coupon_memory[j] = new_coupon
+        for i in range(steps - 1, -1, -1):
+            n = i + 1
+            np.multiply(payoffs[1:n + 1], p_down, out=buffer[:n])
+            payoffs[:n] *= p_up
+            payoffs[:n] += buffer[:n]
+
+            if observation_mask[i]:
+                called = powers[steps - i:steps + i + 1:2][::-1] >= barrier
+                if track_memory:
+                    # Coupons mémorisés payés au rappel, mémoire remise à zéro
+                    redemption = (1 + coupon + coupon_memory[:n]) * discount_factors[i]
+                    np.copyto(payoffs[:n], redemption, where=called)
+                    coupon_memory[:n] += coupon
+                    coupon_memory[:n][called] = 0.0
                 else:
-                    new_payoffs[j] = continuation
-                    if memory_feature:
-                        new_coupon_memory[j] = p * coupon_memory[j] + (1 - p) * coupon_memory[j + 1]
-
-            payoffs = new_payoffs
-            if memory_feature:
-                coupon_memory = new_coupon_memory
+                    payoffs[:n][called] = (1 + coupon) * discount_factors[i]
+            elif track_memory:
+                np.multiply(coupon_memory[1:n + 1], 1 - p, out=buffer[:n])
+                coupon_memory[:n] *= p
+                coupon_memory[:n] += buffer[:n]
 
         return payoffs[0]
 
@@ -171,17 +461,3 @@ class BinomialTreePricer:
         obs_indices = [min(steps, int(round(t / dt + 1e-8))) for t in observation_dates]
 
         return sorted(set(obs_indices))
-
-    @staticmethod
-    def calculate_payoff(price, continuation, coupon, barrier, discount_factor, type_autocall, memory_feature, current_coupon_mem):
-        if price >= barrier:
-            if memory_feature and type_autocall == 'phenix':
-                total = (1 + current_coupon_mem + coupon)
-                return total * discount_factor, 0  # Reset mémoire après paiement
-            else:
-                return (1 + coupon) * discount_factor, None
-        else:
-            if memory_feature:
-                return continuation, current_coupon_mem + coupon
-            else:
-                return continuation, None
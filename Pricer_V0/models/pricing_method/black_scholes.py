@@ -1,88 +1,214 @@
 
 # black_scholes.py
 
+import math
 import numpy as np
-from scipy.stats import norm
 from option_models.option import Option
+from pricing_method.special_functions import is_scalar, norm_cdf, norm_pdf
 
 class BlackScholesPricer:
     def __init__(self, option: Option):
         self.option = option
 
+    @staticmethod
     def price(S, K, T, r, sigma, q, option_type):
-        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-
-        if option_type == "call":
-            price = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-        elif option_type == "put":
-            price = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
-        return price
-        
-
+        """Prix Black-Scholes européen, vectorisé sur tout un lot de contrats.
+
+        S, K, T, r, sigma et q acceptent des tableaux (ou des scalaires diffusés) ;
+        option_type est "call"/"put", un tableau de ces chaînes ou de booléens
+        (True = call). Renvoie un tableau de prix (un scalaire pour des entrées
+        scalaires).
+        """
+        xp, (S, K, T, r, sigma, q), sign = BlackScholesPricer._inputs(S, K, T, r, sigma, q, option_type)
+
+        vol_sqrt_T = sigma * xp.sqrt(T)
+        d1 = BlackScholesPricer._d1(xp, S, K, T, r, sigma, q, vol_sqrt_T)
+        d2 = d1 - vol_sqrt_T
+
+        # Call : S e^(-qT) N(d1) - K e^(-rT) N(d2) ; put : même forme en (-d1, -d2), signe opposé
+        price = sign * (S * xp.exp(-q * T) * norm_cdf(sign * d1) - K * xp.exp(-r * T) * norm_cdf(sign * d2))
+        return price if xp is math else price[()]
+
+    @staticmethod
+    def proba_itm(S, K, T, r, sigma, q, option_type):
+        """Probabilité risque-neutre de finir dans la monnaie, N(d2) ou N(-d2), vectorisée."""
+        xp, (S, K, T, r, sigma, q), sign = BlackScholesPricer._inputs(S, K, T, r, sigma, q, option_type)
+        vol_sqrt_T = sigma * xp.sqrt(T)
+        d2 = BlackScholesPricer._d1(xp, S, K, T, r, sigma, q, vol_sqrt_T) - vol_sqrt_T
+        probability = norm_cdf(sign * d2)
+        # Contrat scalaire dégénéré : norm_cdf d'un numpy.float64 renvoie déjà un float
+        return probability if xp is math else np.asarray(probability)[()]
+
+    @staticmethod
+    def price_digital(S, K, T, r, sigma, q, cash_payout, option_type, barrier=None, barrier_type=None):
+        """Digitale cash-or-nothing : cash_payout e^(-rT) N(+/-d2), vectorisée.
+
+        Une barrière "up"/"down" déjà franchie au spot annule l'option.
+        """
+        xp, (S, K, T, r, sigma, q), sign = BlackScholesPricer._inputs(S, K, T, r, sigma, q, option_type)
+        vol_sqrt_T = sigma * xp.sqrt(T)
+        d2 = BlackScholesPricer._d1(xp, S, K, T, r, sigma, q, vol_sqrt_T) - vol_sqrt_T
+        price = cash_payout * xp.exp(-r * T) * norm_cdf(sign * d2) * BlackScholesPricer._digital_alive(S, barrier, barrier_type)
+        return price if xp is math else price[()]
+
+    @staticmethod
+    def _digital_alive(S, barrier, barrier_type):
+        # 1.0 si l'option est en vie, 0.0 si la barrière est franchie au spot
+        if barrier is None:
+            return 1.0
+        if is_scalar(S, barrier) and isinstance(barrier_type, str):
+            knocked = (barrier_type == "up" and S >= barrier) or (barrier_type == "down" and S <= barrier)
+            return 0.0 if knocked else 1.0
+        S, barrier, barrier_type = np.broadcast_arrays(np.asarray(S, dtype=float), np.asarray(barrier, dtype=float), np.asarray(barrier_type))
+        knocked = ((barrier_type == "up") & (S >= barrier)) | ((barrier_type == "down") & (S <= barrier))
+        return np.where(knocked, 0.0, 1.0)
+
+    @staticmethod
+    def _inputs(S, K, T, r, sigma, q, option_type):
+        # Renvoie (module, paramètres, signe +1 call / -1 put). Contrat scalaire
+        # non dégénéré : floats et module math, sans conversion en tableaux ;
+        # sinon tableaux diffusés et numpy (T = 0 ou sigma = 0 : voir _d1)
+        if isinstance(option_type, str) and is_scalar(S, K, T, r, sigma, q) and min(S, K, T, sigma) > 0:
+            if option_type not in ("call", "put"):
+                raise ValueError("option_type doit être 'call' ou 'put'.")
+            return math, (S, K, T, r, sigma, q), 1.0 if option_type == "call" else -1.0
+
+        S, K, T, r, sigma, q, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)),
+            BlackScholesPricer._call_flags(option_type))
+        return np, (S, K, T, r, sigma, q), np.where(is_call, 1.0, -1.0)
+
+    @staticmethod
+    def _d1(xp, S, K, T, r, sigma, q, vol_sqrt_T):
+        # d1 ; sans valeur temps (T = 0 ou sigma = 0), +/-inf selon que le
+        # forward est au-dessus ou au-dessous du strike (0 à la monnaie) : les
+        # N(+/-d) deviennent des indicatrices et le prix la valeur intrinsèque
+        # actualisée max(+/-(S e^(-qT) - K e^(-rT)), 0)
+        if xp is math:
+            return (math.log(S / K) + (r - q + 0.5 * sigma**2) * T) / vol_sqrt_T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / vol_sqrt_T
+        if np.all(vol_sqrt_T > 0):
+            return d1
+        forward_gap = np.log(S / K) + (r - q) * T
+        limit = np.where(forward_gap > 0, np.inf, np.where(forward_gap < 0, -np.inf, 0.0))
+        return np.where(vol_sqrt_T > 0, d1, limit)
+
+    @staticmethod
+    def _call_flags(option_type):
+        # "call"/"put" (scalaire ou tableau) ou booléens -> tableau booléen (True = call)
+        flags = np.asarray(option_type)
+        if flags.dtype.kind in "USO":
+            if not np.all((flags == "call") | (flags == "put")):
+                raise ValueError("option_type doit être 'call' ou 'put'.")
+            return flags == "call"
+        return flags.astype(bool)
+
+    @staticmethod
+    def implied_volatility_batch(market_price, S, K, T, r, q, option_type,
+                                 tol=1e-8, max_iter=20, sigma_min=1e-4, sigma_max=5.0, initial_guess=None):
+        """Volatilités implicites Black-Scholes d'un lot de cotations.
+
+        Entrées diffusées comme BlackScholesPricer.price. Point de départ de
+        Corrado-Miller, puis itérations de Halley vectorisées : chaque élément
+        sort dès que son erreur en volatilité |prix - cotation| / vega passe
+        sous tol. Les pas qui quittent
+        l'encadrement [sigma_min, sigma_max] courant sont remplacés par son
+        milieu, et seuls les éléments non convergés après max_iter itérations
+        finissent par dichotomie. Renvoie nan hors des bornes d'arbitrage.
+        initial_guess (par exemple les volatilités précédentes) remplace le
+        point de départ là où il est fini.
+        """
+        market_price, S, K, T, r, q, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (market_price, S, K, T, r, q)),
+            BlackScholesPricer._call_flags(option_type))
+        shape = market_price.shape
+        market_price, S, K, T, r, q, is_call = (x.ravel() for x in (market_price, S, K, T, r, q, is_call))
+        sign = np.where(is_call, 1.0, -1.0)
+
+        forward_q = S * np.exp(-q * T)
+        strike_r = K * np.exp(-r * T)
+
+        # Bornes d'arbitrage : valeur intrinsèque actualisée < prix < S e^(-qT) (call) ou K e^(-rT) (put)
+        lower = np.maximum(sign * (forward_q - strike_r), 0.0)
+        upper = np.where(is_call, forward_q, strike_r)
+        valid = (market_price > lower) & (market_price < upper) & (T > 0)
+
+        # Corrado-Miller sur le call équivalent (parité call-put)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            call = market_price + np.where(is_call, 0.0, forward_q - strike_r)
+            moneyness = forward_q - strike_r
+            centered = call - 0.5 * moneyness
+            root = np.sqrt(np.maximum(centered**2 - moneyness**2 / np.pi, 0.0))
+            sigma = math.sqrt(2 * math.pi) / (forward_q + strike_r) * (centered + root) / np.sqrt(T)
+        sigma = np.nan_to_num(sigma, nan=0.2)
+        if initial_guess is not None:
+            initial_guess = np.broadcast_to(np.asarray(initial_guess, dtype=float), shape).ravel()
+            sigma = np.where(np.isfinite(initial_guess), initial_guess, sigma)
+        sigma = np.clip(sigma, sigma_min, sigma_max)
+
+        low = np.full(sigma.shape, sigma_min)
+        high = np.full(sigma.shape, sigma_max)
+        result = np.full(sigma.shape, np.nan)
+        active = np.flatnonzero(valid)
+
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            current = sigma[active]
+            price, vega, d1, d2 = BlackScholesPricer._price_vega(
+                forward_q[active], strike_r[active], T[active], current, sign[active])
+            diff = price - market_price[active]
+
+            converged = np.abs(diff) <= tol * vega
+            result[active[converged]] = current[converged]
+
+            # Le prix croît avec sigma : l'erreur resserre l'encadrement
+            low[active] = np.where(diff < 0, current, low[active])
+            high[active] = np.where(diff > 0, current, high[active])
+
+            keep = ~converged
+            active, current, diff, vega, d1, d2 = (x[keep] for x in (active, current, diff, vega, d1, d2))
+
+            # Halley : d²C/dsigma² = vega d1 d2 / sigma
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                newton = diff / vega
+                candidate = current - newton / (1 - 0.5 * newton * d1 * d2 / current)
+            outside = ~np.isfinite(candidate) | (candidate <= low[active]) | (candidate >= high[active])
+            sigma[active] = np.where(outside, 0.5 * (low[active] + high[active]), candidate)
+
+        # Repli par dichotomie, uniquement sur les éléments non convergés
+        while active.size:
+            current = 0.5 * (low[active] + high[active])
+            price, vega, _, _ = BlackScholesPricer._price_vega(
+                forward_q[active], strike_r[active], T[active], current, sign[active])
+            diff = price - market_price[active]
+            converged = (np.abs(diff) <= tol * vega) | (high[active] - low[active] < tol)
+            result[active[converged]] = current[converged]
+            low[active] = np.where(diff < 0, current, low[active])
+            high[active] = np.where(diff > 0, current, high[active])
+            active = active[~converged]
+
+        return result.reshape(shape)[()]
+
+    @staticmethod
+    def _price_vega(forward_q, strike_r, T, sigma, sign):
+        # Prix, Vega, d1 et d2 à partir de S e^(-qT) et K e^(-rT)
+        vol_sqrt_T = sigma * np.sqrt(T)
+        d1 = np.log(forward_q / strike_r) / vol_sqrt_T + 0.5 * vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        price = sign * (forward_q * norm_cdf(sign * d1) - strike_r * norm_cdf(sign * d2))
+        vega = forward_q * norm_pdf(d1) * np.sqrt(T)
+        return price, vega, d1, d2
 
     def implied_volatility(self, market_price: float, tol=1e-6, max_iter=200):
-        S = self.option.spot
-        K = self.option.strike
-        T = self.option.maturity
-        r = self.option.rate
-
-        # Fixer des limites raisonnables pour la volatilité implicite
-        sigma_min = 0.001  # 0.1% de volatilité minimale
-        sigma_max = 5.0    # 500% de volatilité maximale
-        sigma = 0.2        # Volatilité initiale (20%)
-
-        for i in range(max_iter):
-            # Calcul du prix avec la volatilité actuelle
-            self.option.volatility = sigma
-            price = self.price()
-
-            # Calcul de la différence (erreur)
-            diff = price - market_price
-
-            # Si l'erreur est suffisamment petite, retourner la volatilité
-            if abs(diff) < tol:
-                return sigma
-
-            # Calcul de Vega
-            vega = self.calculate_greeks()["Vega"]
-
-            # Si Vega est trop faible, basculer sur la méthode de dichotomie
-            if abs(vega) < tol:
-                return self._implied_volatility_bisection(market_price, sigma_min, sigma_max, tol, max_iter)
-
-            # Mise à jour de sigma avec Newton-Raphson
-            sigma -= diff / vega
-
-            # S'assurer que sigma reste dans les limites définies
-            sigma = max(sigma_min, min(sigma, sigma_max))
-
-        # Si la convergence échoue avec Newton-Raphson, basculer sur la dichotomie
-        return self._implied_volatility_bisection(market_price, sigma_min, sigma_max, tol, max_iter)
-
-    def _implied_volatility_bisection(self, market_price: float, sigma_min: float, sigma_max: float, tol: float, max_iter: int):
-        for i in range(max_iter):
-            sigma_mid = (sigma_min + sigma_max) / 2
-            self.option.volatility = sigma_mid
-            price = self.price()
-
-            # Calcul de l'erreur
-            diff = price - market_price
-
-            # Si l'erreur est suffisamment petite, retourner la volatilité
-            if abs(diff) < tol:
-                return sigma_mid
-
-            # Mise à jour des bornes
-            if price < market_price:
-                sigma_min = sigma_mid
-            else:
-                sigma_max = sigma_mid
-
-        # Retourne la volatilité moyenne si la convergence n'est pas parfaite
-        return (sigma_min + sigma_max) / 2
-
+        option = self.option
+        return float(BlackScholesPricer.implied_volatility_batch(
+            market_price, option.spot, option.strike, option.maturity, option.rate,
+            option.dividend_yield, option.type_option, tol=tol, max_iter=max_iter))
 
     def price_with_iv(self, implied_volatility: float):
-        self.option.volatility = implied_volatility
-        return self.price()
\ No newline at end of file
+        option = self.option
+        option.volatility = implied_volatility
+        return BlackScholesPricer.price(option.spot, option.strike, option.maturity, option.rate,
+                                        option.volatility, option.dividend_yield, option.type_option)
@@ -0,0 +1,195 @@
+# closed_form.py
+
+import numpy as np
+from pricing_method.black_scholes import BlackScholesPricer
+from pricing_method.special_functions import norm_cdf
+
+
+# Poids des termes (A, B, C, D) de Reiner-Rubinstein, indexés par
+# [call, up, knock-in, K > H] ; le rebate s'ajoute via E (in) ou F (out)
+_BARRIER_WEIGHTS = np.zeros((2, 2, 2, 2, 4))
+for (call, up, knock_in, high_strike), weights in {
+    (1, 0, 1, 1): (0, 0, 1, 0), (1, 0, 1, 0): (1, -1, 0, 1),
+    (1, 0, 0, 1): (1, 0, -1, 0), (1, 0, 0, 0): (0, 1, 0, -1),
+    (1, 1, 1, 1): (1, 0, 0, 0), (1, 1, 1, 0): (0, 1, -1, 1),
+    (1, 1, 0, 1): (0, 0, 0, 0), (1, 1, 0, 0): (1, -1, 1, -1),
+    (0, 0, 1, 1): (0, 1, -1, 1), (0, 0, 1, 0): (1, 0, 0, 0),
+    (0, 0, 0, 1): (1, -1, 1, -1), (0, 0, 0, 0): (0, 0, 0, 0),
+    (0, 1, 1, 1): (1, -1, 0, 1), (0, 1, 1, 0): (0, 0, 1, 0),
+    (0, 1, 0, 1): (0, 1, 0, -1), (0, 1, 0, 0): (1, 0, -1, 0),
+}.items():
+    _BARRIER_WEIGHTS[call, up, knock_in, high_strike] = weights
+
+
+class ClosedFormPricer:
+    """Formules fermées pour options exotiques, vectorisées sur les contrats."""
+
+    OBSERVATIONS_PER_YEAR = {'daily': 365, 'weekly': 52, 'monthly': 12}
+    # Correction de continuité de Broadie-Glasserman-Kou : zeta(1/2) / sqrt(2 pi)
+    BGK_BETA = 0.5826
+
+    @staticmethod
+    def observation_count(maturity, observation_frequency):
+        # Nombre d'observations sur la maturité (None : observation continue)
+        if observation_frequency is None:
+            return None
+        if observation_frequency not in ClosedFormPricer.OBSERVATIONS_PER_YEAR:
+            raise ValueError("La fréquence doit être 'daily', 'weekly', 'monthly' ou None.")
+        maturity = np.asarray(maturity, dtype=float)
+        if np.any(maturity <= 0):
+            raise ValueError("La maturité doit être strictement positive : aucune date d'observation.")
+        # Au moins une observation (t = 0) même si la maturité est plus courte que la période
+        count = np.rint(maturity * ClosedFormPricer.OBSERVATIONS_PER_YEAR[observation_frequency])
+        return np.maximum(count, 1).astype(int)[()]
+
+    @staticmethod
+    def price_geometric_asian(type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+                              num_observations=None):
+        """Asiatique à moyenne géométrique (strike fixe), formule fermée.
+
+        Moyenne sur t_i = i T / n, i = 0..n-1 (échéancier du Monte Carlo), ou
+        continue sur [0, T] si num_observations est None. Le log de la moyenne
+        est gaussien : prix Black-Scholes avec une volatilité et un dividende
+        effectifs. Tous les paramètres acceptent des tableaux.
+        """
+        sigma_eff, q_eff, _, _ = ClosedFormPricer._geometric_asian_parameters(
+            volatility, rate, dividend_yield, num_observations)
+        return BlackScholesPricer.price(spot, strike, maturity, rate, sigma_eff, q_eff, type_option)
+
+    @staticmethod
+    def _geometric_asian_parameters(volatility, rate, dividend_yield, num_observations):
+        # ln G ~ N(ln S + (r - q - sigma²/2) a T, sigma² c T) avec a = moyenne des
+        # t_i / T et c = moyenne des min(t_i, t_j) / T ; renvoie aussi (a, c)
+        volatility, rate, dividend_yield = (np.asarray(x, dtype=float) for x in (volatility, rate, dividend_yield))
+        if num_observations is None:
+            a, c = 0.5, 1 / 3
+        else:
+            n = np.asarray(num_observations, dtype=float)
+            a = (n - 1) / (2 * n)
+            c = (n - 1) * (2 * n - 1) / (6 * n**2)
+
+        # S e^(-q_eff T) = e^(-rT) E[G] et sigma_eff² T = Var(ln G)
+        sigma_eff = volatility * np.sqrt(c)
+        q_eff = rate - (rate - dividend_yield - 0.5 * volatility**2) * a - 0.5 * volatility**2 * c
+        return sigma_eff, q_eff, a, c
+
+    @staticmethod
+    def price_barrier(type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+                      barrier_level, barrier_type, rebate=0.0, num_observations=None):
+        """Barrière européenne, formules de Reiner-Rubinstein (8 cas + rebate).
+
+        Surveillance continue, ou discrète sur num_observations dates via la
+        correction de Broadie-Glasserman-Kou (barrière décalée de
+        exp(+/- 0.5826 sigma sqrt(T / m))). Rebate payé à la touche pour un
+        knock-out, à maturité pour un knock-in non activé. Tous les paramètres,
+        barrier_type compris, acceptent des tableaux.
+        """
+        S, K, T, r, sigma, q, H, R, is_call, barrier_type = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (spot, strike, maturity, rate, volatility, dividend_yield, barrier_level, rebate)),
+            BlackScholesPricer._call_flags(type_option), np.asarray(barrier_type))
+        if not np.all(np.isin(barrier_type, ['up-and-in', 'up-and-out', 'down-and-in', 'down-and-out'])):
+            raise ValueError("Le type de barrière doit être 'up-and-in', 'up-and-out', 'down-and-in' ou 'down-and-out'.")
+        up = np.char.startswith(barrier_type, 'up')
+        knock_in = np.char.endswith(barrier_type, 'in')
+
+        # Barrière déjà franchie : knock-in -> vanille, knock-out -> rebate immédiat
+        crossed = np.where(up, S >= H, S <= H)
+
+        if num_observations is not None:
+            H = H * np.exp(np.where(up, 1.0, -1.0) * ClosedFormPricer.BGK_BETA * sigma * np.sqrt(T / num_observations))
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            phi = np.where(is_call, 1.0, -1.0)
+            eta = np.where(up, -1.0, 1.0)
+            vol_sqrt_T = sigma * np.sqrt(T)
+            mu = (r - q - 0.5 * sigma**2) / sigma**2
+            lam = np.sqrt(mu**2 + 2 * r / sigma**2)
+            forward_q = S * np.exp(-q * T)
+            strike_r = K * np.exp(-r * T)
+            ratio = H / S
+            ratio_mu = ratio**(2 * mu)
+            ratio_mu1 = ratio_mu * ratio**2
+
+            x1 = np.log(S / K) / vol_sqrt_T + (1 + mu) * vol_sqrt_T
+            x2 = np.log(S / H) / vol_sqrt_T + (1 + mu) * vol_sqrt_T
+            y1 = np.log(H**2 / (S * K)) / vol_sqrt_T + (1 + mu) * vol_sqrt_T
+            y2 = np.log(H / S) / vol_sqrt_T + (1 + mu) * vol_sqrt_T
+            z = np.log(H / S) / vol_sqrt_T + lam * vol_sqrt_T
+
+            A = phi * (forward_q * norm_cdf(phi * x1) - strike_r * norm_cdf(phi * (x1 - vol_sqrt_T)))
+            B = phi * (forward_q * norm_cdf(phi * x2) - strike_r * norm_cdf(phi * (x2 - vol_sqrt_T)))
+            C = phi * (forward_q * ratio_mu1 * norm_cdf(eta * y1) - strike_r * ratio_mu * norm_cdf(eta * (y1 - vol_sqrt_T)))
+            D = phi * (forward_q * ratio_mu1 * norm_cdf(eta * y2) - strike_r * ratio_mu * norm_cdf(eta * (y2 - vol_sqrt_T)))
+            E = R * np.exp(-r * T) * (norm_cdf(eta * (x2 - vol_sqrt_T)) - ratio_mu * norm_cdf(eta * (y2 - vol_sqrt_T)))
+            F = R * (ratio**(mu + lam) * norm_cdf(eta * z) + ratio**(mu - lam) * norm_cdf(eta * (z - 2 * lam * vol_sqrt_T)))
+
+            weights = _BARRIER_WEIGHTS[is_call.astype(int), up.astype(int), knock_in.astype(int), (K > H).astype(int)]
+            # Un poids nul neutralise aussi un terme non fini
+            terms = np.stack([A, B, C, D], axis=-1)
+            price = np.where(weights != 0, weights * terms, 0.0).sum(axis=-1) + np.where(knock_in, E, F)
+
+        if np.any(crossed):
+            vanilla = BlackScholesPricer.price(S, K, T, r, sigma, q, is_call)
+            price = np.where(crossed, np.where(knock_in, vanilla, R), price)
+        return price[()]
+
+    @staticmethod
+    def price_lookback(type_option, spot, strike, maturity, rate, volatility, dividend_yield, strike_type,
+                       min_price_observed=None, max_price_observed=None, num_observations=None):
+        """Lookback européenne à strike fixe ou flottant, formules fermées.
+
+        Goldman-Sosin-Gatto (flottant) et Conze-Viswanathan (fixe), avec les
+        extrêmes déjà observés pour une option en vie (par défaut aucun :
+        l'extrême part du spot). Surveillance discrète sur num_observations
+        dates : décalage de Broadie-Glasserman-Kou de l'extrême à venir,
+        exp(-/+ 0.5826 sigma sqrt(T / m)) ; les extrêmes observés, déjà
+        discrets, ne sont pas décalés. Tous les paramètres acceptent des tableaux.
+        """
+        strike = np.nan if strike is None else strike
+        minimum = np.inf if min_price_observed is None else min_price_observed
+        maximum = -np.inf if max_price_observed is None else max_price_observed
+        S, K, T, r, sigma, q, minimum, maximum, is_call, strike_type = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (spot, strike, maturity, rate, volatility, dividend_yield, minimum, maximum)),
+            BlackScholesPricer._call_flags(type_option), np.asarray(strike_type))
+        if not np.all(np.isin(strike_type, ['fixed', 'floating'])):
+            raise ValueError("Le type de strike doit être 'fixed' ou 'floating'.")
+        fixed = strike_type == 'fixed'
+
+        # phi = +1 : option sur le maximum (call fixe, put flottant) ; -1 : sur le minimum
+        phi = np.where(is_call == fixed, 1.0, -1.0)
+
+        # Surveillance discrète : extrême discret à venir ~ extrême continu * scale.
+        # Le spot n'est pas une observation : l'extrême continu part du spot et
+        # seul l'extrême observé est ramené à l'échelle continue, ce qui garde
+        # le prix C¹ en S = K
+        scale = np.ones_like(S)
+        if num_observations is not None:
+            scale = np.exp(-phi * ClosedFormPricer.BGK_BETA * sigma * np.sqrt(T / num_observations))
+        extreme = np.where(phi > 0, np.maximum(maximum / scale, S), np.minimum(minimum / scale, S))
+        K = K / scale
+
+        # Fixe : valeur acquise e^(-rT) (phi (extrême - K))^+ plus l'option de strike X
+        X = np.where(fixed, np.where(phi * (extreme - K) > 0, extreme, K), extreme)
+        value = ClosedFormPricer._lookback_extreme_option(S, X, T, r, sigma, q, phi)
+        forward_q = S * np.exp(-q * T)
+        fixed_price = np.exp(-r * T) * np.maximum(phi * (extreme - K), 0.0) + value
+        # Flottant : parité avec l'option fixe de strike égal à l'extrême
+        floating_price = value - phi * (forward_q - extreme * np.exp(-r * T))
+
+        price = scale * np.where(fixed, fixed_price, floating_price + phi * forward_q) - np.where(fixed, 0.0, phi * forward_q)
+        return price[()]
+
+    @staticmethod
+    def _lookback_extreme_option(S, X, T, r, sigma, q, phi):
+        # E[e^(-rT) (phi (extrême - X))^+] pour un extrême partant du spot, X au-delà du spot
+        b = r - q
+        # b = 0 : limite régulière, approchée par un portage de 1e-7
+        b = np.where(np.abs(b) < 1e-7, np.where(b < 0, -1e-7, 1e-7), b)
+        vol_sqrt_T = sigma * np.sqrt(T)
+        d1 = (np.log(S / X) + (b + 0.5 * sigma**2) * T) / vol_sqrt_T
+        d2 = d1 - vol_sqrt_T
+        discount_r = np.exp(-r * T)
+        vanilla = phi * (S * np.exp(-q * T) * norm_cdf(phi * d1) - X * discount_r * norm_cdf(phi * d2))
+        reflection = phi * (-(S / X)**(-2 * b / sigma**2) * norm_cdf(phi * (d1 - 2 * b * np.sqrt(T) / sigma))
+                            + np.exp(b * T) * norm_cdf(phi * d1))
+        return vanilla + S * discount_r * sigma**2 / (2 * b) * reflection
@@ -0,0 +1,228 @@
+# finite_difference.py
+
+import math
+import numpy as np
+from scipy.linalg import lapack
+from pricing_method.black_scholes import BlackScholesPricer
+
+
+class FiniteDifferencePricer:
+    """Schéma de Crank-Nicolson en log-spot (démarrage de Rannacher).
+
+    Chaque résolution renvoie le prix, le Delta et le Gamma lus sur la grille
+    au spot, et le Theta (dV/dt, convention Black-Scholes) tiré du dernier pas
+    de temps.
+    """
+
+    @staticmethod
+    def price_vanilla(S, K, T, r, sigma, q=0, option_type="call", american=False,
+                      space_steps=200, time_steps=100, width=5.0):
+        if sigma * math.sqrt(T) == 0:
+            return FiniteDifferencePricer._deterministic_vanilla(S, K, T, r, q, option_type, american, time_steps)
+
+        # Grille centrée sur ln(S), assez large pour contenir le strike
+        half_width = max(width * sigma * math.sqrt(T), 1.5 * abs(math.log(K / S)))
+        center = space_steps // 2
+        dx = half_width / center
+        x = math.log(S) + dx * (np.arange(space_steps + 1) - center)
+        spots = np.exp(x)
+
+        sign = 1.0 if option_type == "call" else -1.0
+        intrinsic = np.maximum(sign * (spots - K), 0.0)
+        payoff = FiniteDifferencePricer._cell_average(x, lambda s: np.maximum(sign * (s - K), 0.0))
+        spot_min, spot_max = spots[0], spots[-1]
+
+        def boundaries(tau):
+            # Valeurs asymptotiques : forward actualisé côté dans la monnaie, 0 sinon
+            bounds = []
+            for edge in (spot_min, spot_max):
+                value = sign * (edge * np.exp(-q * tau) - K * np.exp(-r * tau))
+                if american:
+                    value = np.maximum(value, sign * (edge - K))
+                bounds.append(np.maximum(value, 0.0))
+            return bounds
+
+        values, previous, dtau = FiniteDifferencePricer._crank_nicolson(
+            x, payoff, boundaries, T, r, sigma, q, time_steps,
+            exercise=intrinsic if american else None)
+        return FiniteDifferencePricer._grid_greeks(values, previous, center, dx, dtau, S)
+
+    @staticmethod
+    def _deterministic_vanilla(S, K, T, r, q, option_type, american, time_steps):
+        # Sans valeur temps (sigma sqrt(T) = 0) : trajectoire certaine S e^((r - q) t),
+        # exercice à maturité (européenne) ou à la meilleure date de la grille
+        # (américaine). À la monnaie, poids 1/2 comme Black-Scholes (d1 = 0)
+        sign = 1.0 if option_type == "call" else -1.0
+        times = np.linspace(0.0, T, time_steps + 1) if american else np.array([float(T)])
+        moneyness = sign * (S * np.exp(-q * times) - K * np.exp(-r * times))
+        best = int(np.argmax(moneyness)) if np.max(moneyness) > 0 else len(times) - 1
+        exercise_time = times[best]
+        weight = 0.5 * (1 + np.sign(moneyness[best]))
+
+        # Theta (dV/dt) : seul un exercice à maturité dépend du temps restant, et
+        # une américaine ne perd jamais de valeur avec la maturité
+        theta = 0.0
+        if exercise_time == T:
+            theta = weight * sign * (q * S * math.exp(-q * T) - r * K * math.exp(-r * T))
+            if american:
+                theta = min(theta, 0.0)
+        return {"Price": float(max(0.0, moneyness[best])), "Delta": float(weight * sign * math.exp(-q * exercise_time)),
+                "Gamma": 0.0, "Theta": float(theta)}
+
+    @staticmethod
+    def price_barrier(type_option, spot, strike, maturity, rate, volatility, dividend_yield,
+                      barrier_level, barrier_type, rebate=0.0,
+                      space_steps=200, time_steps=100, width=5.0):
+        up = "up" in barrier_type
+        knock_in = "in" in barrier_type
+        option_type = "call" if "call" in type_option else "put"
+
+        # Barrière déjà franchie : knock-in -> vanille (prix et grecs sur sa
+        # propre grille), knock-out -> rebate constant
+        if (up and spot >= barrier_level) or (not up and spot <= barrier_level):
+            if knock_in:
+                return FiniteDifferencePricer.price_vanilla(
+                    spot, strike, maturity, rate, volatility, dividend_yield, option_type,
+                    space_steps=space_steps, time_steps=time_steps, width=width)
+            return {"Price": float(rebate), "Delta": 0.0, "Gamma": 0.0, "Theta": 0.0}
+
+        if volatility * math.sqrt(maturity) == 0:
+            # Trajectoire certaine : franchissement éventuel sur la grille de temps
+            times = np.linspace(0.0, maturity, time_steps + 1)
+            path = spot * np.exp((rate - dividend_yield) * times)
+            hit = path >= barrier_level if up else path <= barrier_level
+            if knock_in == hit.any():
+                return FiniteDifferencePricer._deterministic_vanilla(
+                    spot, strike, maturity, rate, dividend_yield, option_type, False, time_steps)
+            if knock_in:
+                # Jamais activée : rebate payé à maturité
+                price = rebate * math.exp(-rate * maturity)
+                return {"Price": float(price), "Delta": 0.0, "Gamma": 0.0, "Theta": float(rate * price)}
+            # Désactivée : rebate payé au franchissement
+            price = rebate * math.exp(-rate * times[np.argmax(hit)])
+            return {"Price": float(price), "Delta": 0.0, "Gamma": 0.0, "Theta": 0.0}
+
+        # La barrière est un bord exact de la grille et le spot tombe sur un noeud
+        distance = abs(math.log(barrier_level / spot))
+        far_width = max(width * volatility * math.sqrt(maturity), 1.5 * abs(math.log(strike / spot)))
+        dx_target = (distance + far_width) / space_steps
+        barrier_nodes = max(2, round(distance / dx_target))
+        dx = distance / barrier_nodes
+        far_nodes = max(2, math.ceil(far_width / dx))
+
+        if up:
+            center = far_nodes
+            x = math.log(spot) + dx * (np.arange(far_nodes + barrier_nodes + 1) - far_nodes)
+        else:
+            center = barrier_nodes
+            x = math.log(spot) + dx * (np.arange(far_nodes + barrier_nodes + 1) - barrier_nodes)
+        spots = np.exp(x)
+        sign = 1.0 if option_type == "call" else -1.0
+
+        if knock_in:
+            # Non activée à maturité : rebate ; sur la barrière : vanille Black-Scholes
+            payoff = np.full(spots.shape, float(rebate))
+        else:
+            payoff = FiniteDifferencePricer._cell_average(x, lambda s: np.maximum(sign * (s - strike), 0.0))
+        far_spot = spots[0] if up else spots[-1]
+
+        def boundaries(tau):
+            if knock_in:
+                # tau = 0 : prix Black-Scholes limite, soit le payoff sur la barrière
+                elapsed = np.maximum(tau, 1e-12)
+                on_barrier = BlackScholesPricer.price(barrier_level, strike, elapsed, rate, volatility, dividend_yield, option_type)
+                far = rebate * np.exp(-rate * tau)
+            else:
+                on_barrier = np.full(tau.shape, float(rebate))
+                far = np.maximum(sign * (far_spot * np.exp(-dividend_yield * tau) - strike * np.exp(-rate * tau)), 0.0)
+            return (far, on_barrier) if up else (on_barrier, far)
+
+        values, previous, dtau = FiniteDifferencePricer._crank_nicolson(
+            x, payoff, boundaries, maturity, rate, volatility, dividend_yield, time_steps)
+        return FiniteDifferencePricer._grid_greeks(values, previous, center, dx, dtau, spot)
+
+    @staticmethod
+    def _crank_nicolson(x, payoff, boundaries, T, r, sigma, q, time_steps, exercise=None,
+                        rannacher_steps=2, penalty=1e8, max_penalty_iter=20):
+        # V_tau = 0.5 sigma² V_xx + (r - q - 0.5 sigma²) V_x - r V, en temps restant tau.
+        # boundaries(taus) renvoie les valeurs de Dirichlet (bord bas, bord haut).
+        # Renvoie les valeurs à tau = T, celles du pas précédent et ce pas.
+        dx = x[1] - x[0]
+        alpha = 0.5 * sigma**2 / dx**2
+        beta = (r - q - 0.5 * sigma**2) / (2 * dx)
+        lower, diag, upper = alpha - beta, -2 * alpha - r, alpha + beta
+        size = len(x)
+
+        dtau = T / time_steps
+        rannacher_steps = min(rannacher_steps, time_steps)
+        # Démarrage de Rannacher : les premiers pas en Euler implicite (demi-pas)
+        schedule = [(dtau / 2, 1.0)] * (2 * rannacher_steps) + [(dtau, 0.5)] * (time_steps - rannacher_steps)
+
+        def system(step, theta):
+            # Matrice tridiagonale (I - theta dtau L), lignes de bord de Dirichlet
+            sub = np.full(size - 1, -theta * step * lower)
+            main = np.full(size, 1 - theta * step * diag)
+            sup = np.full(size - 1, -theta * step * upper)
+            main[0] = main[-1] = 1.0
+            sup[0] = sub[-1] = 0.0
+            return sub, main, sup
+
+        # Matrices constantes : factorisées une fois par type de pas
+        systems = {key: system(*key) for key in set(schedule)}
+        factorized = {key: lapack.dgttrf(*systems[key])[:5] for key in systems}
+
+        # Conditions de Dirichlet évaluées en une fois sur tous les instants
+        taus = np.concatenate(([0.0], np.cumsum([step for step, _ in schedule])))
+        lower_bounds, upper_bounds = boundaries(taus)
+
+        values = payoff.astype(float).copy()
+        values[0], values[-1] = lower_bounds[0], upper_bounds[0]
+        previous = values
+
+        for n, (step, theta) in enumerate(schedule, start=1):
+            previous = values
+
+            # Second membre : (I + (1 - theta) dtau L) V sur les noeuds intérieurs
+            rhs = values.copy()
+            if theta < 1.0:
+                explicit = (1 - theta) * step
+                rhs[1:-1] += explicit * (lower * values[:-2] + diag * values[1:-1] + upper * values[2:])
+            rhs[0], rhs[-1] = lower_bounds[n], upper_bounds[n]
+
+            if exercise is None:
+                values = lapack.dgttrs(*factorized[(step, theta)], rhs)[0]
+                continue
+
+            # Exercice anticipé par pénalisation : on itère sur l'ensemble actif
+            values = lapack.dgttrs(*factorized[(step, theta)], rhs)[0]
+            sub, main, sup = systems[(step, theta)]
+            active = np.zeros(size, dtype=bool)
+            for _ in range(max_penalty_iter):
+                new_active = values < exercise
+                new_active[0] = new_active[-1] = False
+                if np.array_equal(new_active, active):
+                    break
+                active = new_active
+                values = lapack.dgtsv(sub, main + penalty * active, sup, rhs + penalty * active * exercise)[3]
+            values = np.maximum(values, exercise)
+
+        return values, previous, schedule[-1][0]
+
+    @staticmethod
+    def _cell_average(x, payoff, samples=16):
+        # Payoff moyenné sur chaque maille : supprime l'erreur due au point anguleux du strike
+        dx = x[1] - x[0]
+        offsets = dx * ((np.arange(samples) + 0.5) / samples - 0.5)
+        return payoff(np.exp(x[:, None] + offsets)).mean(axis=1)
+
+    @staticmethod
+    def _grid_greeks(values, previous, index, dx, dtau, spot):
+        # Dérivées en x au noeud du spot, puis passage en S
+        v_x = (values[index + 1] - values[index - 1]) / (2 * dx)
+        v_xx = (values[index + 1] - 2 * values[index] + values[index - 1]) / dx**2
+        return {
+            "Price": float(values[index]),
+            "Delta": float(v_x / spot),
+            "Gamma": float((v_xx - v_x) / spot**2),
+            "Theta": float(-(values[index] - previous[index]) / dtau),
+        }
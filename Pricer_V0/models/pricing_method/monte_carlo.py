@@ -2,142 +2,257 @@
 
 #monte_carlo.py
 
+from functools import partial
 import numpy as np
 import pandas as pd
+from pricing_method.closed_form import ClosedFormPricer
+from pricing_method.monte_carlo_stats import MonteCarloEstimate, RunningStats
+from pricing_method.path_reducers import CrossingFlag, ObservationSum, RunningMax, RunningMin
+from pricing_method.scenario_executor import ScenarioExecutor
 
 class MonteCarloPricer:
+    # Taille fixe des blocs de chemins portant chacun leur flux aléatoire
+    RANDOM_BLOCK_SIZE = 10_000
+
+    @staticmethod
+    def random_blocks(num_paths, seed=None):
+        """Découpe num_paths en blocs de RANDOM_BLOCK_SIZE chemins, chacun avec son générateur.
+
+        Renvoie [(début, fin, générateur)]. Le bloc b tire dans un PCG64
+        initialisé par le b-ième enfant de SeedSequence(seed) : les tirages
+        d'un chemin ne dépendent que de seed et de son bloc, pas du découpage
+        en lots ni de l'ordre d'exécution, et aucun état global n'est partagé.
+        """
+        entropy = np.random.SeedSequence(seed).entropy
+        size = MonteCarloPricer.RANDOM_BLOCK_SIZE
+        return [
+            (start, min(start + size, num_paths),
+             np.random.Generator(np.random.PCG64(np.random.SeedSequence(entropy, spawn_key=(block,)))))
+            for block, start in enumerate(range(0, num_paths, size))
+        ]
+
+    @staticmethod
+    def _chunk_blocks(blocks, chunk_size):
+        # Regroupe les blocs par lots d'environ chunk_size chemins
+        per_chunk = max(1, chunk_size // MonteCarloPricer.RANDOM_BLOCK_SIZE)
+        return [blocks[i:i + per_chunk] for i in range(0, len(blocks), per_chunk)]
 
     @staticmethod
     def simulate_gbm_euler(S, T, r, sigma, q, num_paths, time_steps, seed=None):
-        if seed is not None:
-            np.random.seed(seed)
+        return MonteCarloPricer._simulate_chunk(
+            S, T, r, sigma, q, MonteCarloPricer.random_blocks(num_paths, seed), time_steps)
+
+    @staticmethod
+    def _standard_normals(blocks, shape_tail=()):
+        # Remplit un tableau (chemins du lot, ...) bloc par bloc, sans copie
+        offset = blocks[0][0]
+        normals = np.empty((blocks[-1][1] - offset,) + shape_tail)
+        for start, stop, generator in blocks:
+            generator.standard_normal(out=normals[start - offset:stop - offset])
+        return normals
 
+    @staticmethod
+    def _simulate_chunk(S, T, r, sigma, q, blocks, time_steps):
         dt = T / time_steps
         # Incréments brownien
-        dW = np.random.randn(num_paths, time_steps) * np.sqrt(dt)
-        
-        # On calcule la somme cumulée des accroissements du log(S)
-        log_increments = (r - q - 0.5 * sigma**2) * dt + sigma * dW
-        log_S = np.cumsum(log_increments, axis=1) # On fait la somme cumulée sur chaque ligne (axis=1)
-        log_S = np.log(S) + log_S  # On ajoute log(S) au début, pour « accrocher » la trajectoire au spot initial
-        S_paths = np.exp(log_S) # Maintenant, exp pour repasser en niveau
-        
-        # Au lieu de partir directement à t=0, on ajoute la colonne initiale S
-        S_paths = np.hstack((np.full((num_paths, 1), S), S_paths))
-        
+        dW = MonteCarloPricer._standard_normals(blocks, (time_steps,))
+        dW *= np.sqrt(dt)
+        num_paths = len(dW)
+
+        # Trajectoires écrites en place : colonne initiale S, puis somme cumulée
+        # des accroissements du log(S) et passage en niveau
+        S_paths = np.empty((num_paths, time_steps + 1))
+        S_paths[:, 0] = S
+        log_S = S_paths[:, 1:]
+        np.multiply(dW, sigma, out=log_S)
+        log_S += (r - q - 0.5 * sigma**2) * dt
+        np.cumsum(log_S, axis=1, out=log_S)
+        log_S += np.log(S)
+        np.exp(log_S, out=log_S)
+
         return S_paths, dW
 
+    @staticmethod
+    def uniform_schedule(T, time_steps):
+        # Dates de simulation d'une grille régulière, t = 0 exclu
+        return T * np.arange(1, time_steps + 1) / time_steps
+
+    @staticmethod
+    def observation_schedule(maturity, num_observations):
+        # Dates t_k = k T / n, k = 0 .. n - 1 : même convention que la
+        # formule fermée de l'asiatique géométrique
+        return maturity * np.arange(num_observations) / num_observations
+
+    @staticmethod
+    def simulate_gbm_reduced(S, times, r, sigma, q, blocks, reducers):
+        """Fait avancer les chemins de blocks de date en date sans stocker la matrice.
+
+        times contient les dates de simulation croissantes (t = 0 exclu), pas
+        forcément régulières : le GBM est échantillonné exactement entre deux
+        dates. blocks est une suite contiguë de random_blocks. Seul le vecteur
+        des spots courants est conservé ; à chaque date, y compris t = 0
+        (étape 0), les réducteurs le résument en place. Renvoie le vecteur des
+        spots à la dernière date.
+        """
+        dt = np.diff(times, prepend=0.0)
+        drift = (r - q - 0.5 * sigma**2) * dt
+        diffusion = sigma * np.sqrt(dt)
+
+        num_paths = blocks[-1][1] - blocks[0][0]
+        log_S = np.full(num_paths, np.log(S))
+        spots = np.full(num_paths, float(S))
+        for reducer in reducers:
+            reducer.update(0, spots)
+        for step in range(1, len(dt) + 1):
+            increments = MonteCarloPricer._standard_normals(blocks)
+            increments *= diffusion[step - 1]
+            increments += drift[step - 1]
+            log_S += increments
+            np.exp(log_S, out=spots)
+            for reducer in reducers:
+                reducer.update(step, spots)
+        return spots
+
+    @staticmethod
+    def streamed_stats(sample_function, reducers, S, times, r, sigma, q, num_paths,
+                       chunk_size=20_000, seed=None, parallel=True):
+        """Moyenne et variance (RunningStats) de sample_function(spots finaux, *reducers).
+
+        Les lots de blocs sont répartis sur le pool de ScenarioExecutor.
+        Chaque lot renvoie les statistiques de ses blocs, fusionnées ici dans
+        l'ordre des blocs : pour une graine donnée, le résultat est identique
+        au bit près quels que soient chunk_size et le nombre de workers.
+        sample_function et les réducteurs sont envoyés aux workers : ils
+        doivent être picklables (méthodes statiques, functools.partial).
+        """
+        chunks = MonteCarloPricer._chunk_blocks(MonteCarloPricer.random_blocks(num_paths, seed), chunk_size)
+        results = ScenarioExecutor.run(MonteCarloPricer._chunk_stats, {
+            index: dict(sample_function=sample_function, reducers=reducers, S=S, times=times,
+                        r=r, sigma=sigma, q=q, blocks=chunk)
+            for index, chunk in enumerate(chunks)
+        }, parallel=parallel)
+
+        stats = RunningStats()
+        for chunk_stats in results.values():
+            for block_stats in chunk_stats:
+                stats.merge(block_stats)
+        return stats
+
+    @staticmethod
+    def _chunk_stats(sample_function, reducers, S, times, r, sigma, q, blocks):
+        # Tâche d'un worker : simule un lot puis réduit ses échantillons bloc par bloc
+        final_S = MonteCarloPricer.simulate_gbm_reduced(S, times, r, sigma, q, blocks, reducers)
+        samples = sample_function(final_S, *reducers)
+        offset = blocks[0][0]
+        return [RunningStats().update(samples[start - offset:stop - offset]) for start, stop, _ in blocks]
+
+    @staticmethod
+    def _streamed_price(payoff, reducers, S, T, r, sigma, q, num_paths, times, chunk_size, seed, parallel):
+        # Prix actualisé (paiement en T) et son erreur standard
+        stats = MonteCarloPricer.streamed_stats(
+            payoff, reducers, S, times, r, sigma, q, num_paths, chunk_size, seed, parallel)
+        discount = np.exp(-r * T)
+        return MonteCarloEstimate(discount * stats.mean, discount * stats.std_error, stats.count)
+
     @staticmethod
     def price_barrier(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
         barrier_level, barrier_type, rebate=0.0,
-        num_paths=500000, time_steps=200, seed=None):
-
-        # 1) Simulation des trajectoires
-        S_paths, _ = MonteCarloPricer.simulate_gbm_euler(
-            S=spot, T=maturity, r=rate, sigma=volatility, q=dividend_yield,
-            num_paths=num_paths, time_steps=time_steps, seed=seed)
-        
-        if "up" in barrier_type:
-            crossed = np.any(S_paths >= barrier_level, axis=1)
-        else:  # "down"
-            crossed = np.any(S_paths <= barrier_level, axis=1)
-        
-
-        # 2) Vérification du franchissement de la barrière
-        final_underlyings = S_paths[:, -1]  # Dernier point de chaque trajectoire simulée
+        num_paths=500000, time_steps=200, seed=None, chunk_size=20_000, parallel=True):
+
+        # Franchissement de la barrière, y compris au spot initial
+        reducers = [CrossingFlag(barrier_level, up="up" in barrier_type)]
+        payoff = partial(MonteCarloPricer._barrier_payoff, type_option=type_option, strike=strike,
+                         barrier_type=barrier_type, rebate=rebate)
+        return MonteCarloPricer._streamed_price(
+            payoff, reducers, spot, maturity, rate, volatility, dividend_yield, num_paths,
+            MonteCarloPricer.uniform_schedule(maturity, time_steps), chunk_size, seed, parallel)
 
+    @staticmethod
+    def _barrier_payoff(final_underlyings, crossing, type_option, strike, barrier_type, rebate):
+        # Payoff vanille au dernier point de chaque trajectoire
         if "call" in type_option:
-            vanilla_payoffs = np.maximum(final_underlyings - strike, 0.0)
+            payoffs = np.maximum(final_underlyings - strike, 0.0)
         else:  # "put"
-            vanilla_payoffs = np.maximum(strike - final_underlyings, 0.0)
-  
-        # 4) Application de la condition knock-in / knock-out + rebate
-        payoffs = vanilla_payoffs.copy() 
+            payoffs = np.maximum(strike - final_underlyings, 0.0)
+
+        # Application de la condition knock-in / knock-out + rebate
         if "in" in barrier_type:
-            payoffs[~crossed] = rebate
+            payoffs[~crossing.value] = rebate
         else:
-            payoffs[crossed] = rebate
-
-        # Actualisation et calcul du prix
-        discounted_payoffs = np.exp(-rate * maturity) * payoffs
-        price = np.mean(discounted_payoffs)
-        return price
+            payoffs[crossing.value] = rebate
+        return payoffs
 
     @staticmethod
     def price_asian(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
-        average_type, observation_frequency, num_paths = 50000, time_steps=200, seed=None
+        average_type, observation_frequency, num_paths = 50000, time_steps=200, seed=None, chunk_size=20_000,
+        parallel=True
     ):
-    
-        if maturity > 1.8:
-            time_steps = 500
-        
-
-        # Simulation des trajectoires du sous-jacent
-        S_paths, _  = MonteCarloPricer.simulate_gbm_euler(spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed)
-
-        # Sélection des points d'observation en fonction de la fréquence
-        if observation_frequency == 'daily':
-            num_observations = round(maturity * 365)
-        elif observation_frequency == 'weekly':
-            num_observations = round(maturity * 52)
-        elif observation_frequency == 'monthly':
-            num_observations = round(maturity * 12)
-        else:
-            raise ValueError("frequency must be 'daily', 'weekly', or 'monthly'.")
+        """Asiatique sur des observations t_k = k T / n, k = 0 .. n - 1.
 
-        observation_indices = np.linspace(0, time_steps, num_observations, endpoint=False, dtype=int)
-        observed_prices = S_paths[:, observation_indices]
+        Le GBM est tiré exactement aux seules dates d'observation : aucun biais
+        de discrétisation, time_steps est sans effet.
+        """
+        num_observations = MonteCarloPricer.asian_observation_count(maturity, observation_frequency)
+        if average_type not in ("arithmetic", "geometric"):
+            raise ValueError("average_type must be 'arithmetic' or 'geometric'.")
 
+        observation_dates = MonteCarloPricer.observation_schedule(maturity, num_observations)
+        # Somme des spots (ou de leurs log) aux dates d'observation, t = 0 compris
+        reducers = [ObservationSum(np.arange(num_observations), log=average_type == "geometric")]
+        payoff = partial(MonteCarloPricer._asian_payoff, type_option=type_option, strike=strike,
+                         average_type=average_type)
+        return MonteCarloPricer._streamed_price(
+            payoff, reducers, spot, maturity, rate, volatility, dividend_yield, num_paths,
+            observation_dates[1:], chunk_size, seed, parallel)
 
+    @staticmethod
+    def asian_observation_count(maturity, observation_frequency):
+        # Observations discrètes uniquement : la moyenne continue n'a pas de version Monte Carlo
+        if observation_frequency is None:
+            raise ValueError("La fréquence doit être 'daily', 'weekly' ou 'monthly'.")
+        return int(ClosedFormPricer.observation_count(maturity, observation_frequency))
+
+    @staticmethod
+    def asian_average(observations, average_type):
         # Calcul de la moyenne selon le type spécifié
         if average_type == "arithmetic":
-            averages = np.mean(observed_prices, axis=1)
-        elif average_type == "geometric":
-            averages = np.exp(np.mean(np.log(observed_prices), axis=1))
-        else:
-            raise ValueError("average_type must be 'arithmetic' or 'geometric'.")
+            return observations.mean
+        return np.exp(observations.mean)
 
-        # Calcul des payoffs
+    @staticmethod
+    def _asian_payoff(final_S, observations, type_option, strike, average_type):
+        averages = MonteCarloPricer.asian_average(observations, average_type)
         if type_option == "call":
-            payoffs = np.maximum(averages - strike, 0)
-        else:  # put
-            payoffs = np.maximum(strike - averages, 0)
-
-        # Actualisation du payoff
-        return np.exp(-rate * maturity) * np.mean(payoffs)
+            return np.maximum(averages - strike, 0)
+        return np.maximum(strike - averages, 0)  # put
 
     @staticmethod
     def price_lookback(
         type_option, spot, strike, maturity, rate, volatility, dividend_yield,
-        strike_type, num_paths=500000, time_steps=200, seed=None
+        strike_type, num_paths=500000, time_steps=200, seed=None, chunk_size=20_000, parallel=True
     ):
- 
-        # Simulation des trajectoires du sous-jacent
-        S_paths, _  = MonteCarloPricer.simulate_gbm_euler(spot, maturity, rate, volatility, dividend_yield, num_paths, time_steps, seed)
+        if strike_type not in ("fixed", "floating"):
+            raise ValueError("strike_type must be 'fixed' or 'floating'.")
+
+        # Extrema courants de chaque trajectoire
+        reducers = [RunningMin(), RunningMax()]
+        payoff = partial(MonteCarloPricer._lookback_payoff, type_option=type_option, strike=strike,
+                         strike_type=strike_type)
+        return MonteCarloPricer._streamed_price(
+            payoff, reducers, spot, maturity, rate, volatility, dividend_yield, num_paths,
+            MonteCarloPricer.uniform_schedule(maturity, time_steps), chunk_size, seed, parallel)
 
-        # Extraction des valeurs min/max de chaque trajectoire
-        min_S = np.min(S_paths, axis=1)
-        max_S = np.max(S_paths, axis=1)
-        final_S = S_paths[:, -1]
+    @staticmethod
+    def _lookback_payoff(final_S, running_min, running_max, type_option, strike, strike_type):
+        min_S, max_S = running_min.value, running_max.value
 
         # Pricing en fonction du type de lookback (strike fixe ou flottant)
         if strike_type == "fixed":
             if type_option == "call":
-                payoffs = np.maximum(max_S - strike, 0)
-            else:  # Put
-                payoffs = np.maximum(strike - min_S, 0)
-        elif strike_type == "floating":
-            if type_option == "call":
-                payoffs = np.maximum(final_S - min_S, 0)
-            else:  # Put
-                payoffs = np.maximum(max_S - final_S, 0)
-        else:
-            raise ValueError("strike_type must be 'fixed' or 'floating'.")
-
-        # Actualisation du payoff
-        return np.exp(-rate * maturity) * np.mean(payoffs)
-
-
-
+                return np.maximum(max_S - strike, 0)
+            return np.maximum(strike - min_S, 0)  # Put
+        if type_option == "call":
+            return np.maximum(final_S - min_S, 0)
+        return np.maximum(max_S - final_S, 0)  # Put
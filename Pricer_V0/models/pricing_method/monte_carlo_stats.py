@@ -0,0 +1,68 @@
+# monte_carlo_stats.py
+
+import numpy as np
+
+
+class RunningStats:
+    """Moyenne et variance en ligne, par blocs (fusion de Chan / Welford).
+
+    Chaque update réduit un bloc d'échantillons (axe 0) à (effectif, moyenne,
+    somme des carrés des écarts) puis le fusionne : la mémoire ne dépend pas
+    du nombre total d'échantillons. Les statistiques peuvent être
+    vectorielles (un estimateur par colonne).
+    """
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def update(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        count = samples.shape[0]
+        if count == 0:
+            return self
+        mean = samples.mean(axis=0)
+        m2 = np.square(samples - mean).sum(axis=0)
+        return self._merge(count, mean, m2)
+
+    def merge(self, other):
+        return self._merge(other.count, other.mean, other.m2)
+
+    def _merge(self, count, mean, m2):
+        if count == 0:
+            return self
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + np.square(delta) * (self.count * count / total)
+        self.count = total
+        return self
+
+    @property
+    def variance(self):
+        # Variance empirique non biaisée
+        return self.m2 / (self.count - 1) if self.count > 1 else np.full_like(self.m2, np.nan)
+
+    @property
+    def std_error(self):
+        return np.sqrt(self.variance / self.count) if self.count > 1 else np.full_like(self.m2, np.nan)
+
+
+class MonteCarloEstimate(float):
+    """Prix Monte Carlo : un float qui porte son erreur standard."""
+
+    def __new__(cls, value, std_error, num_paths):
+        estimate = super().__new__(cls, value)
+        estimate.std_error = float(std_error)
+        estimate.num_paths = num_paths
+        return estimate
+
+    def confidence_interval(self, z=1.96):
+        return float(self) - z * self.std_error, float(self) + z * self.std_error
+
+    def __repr__(self):
+        return f"{float(self)!r} ± {self.std_error:.2g}"
+
+    def __reduce__(self):
+        return (MonteCarloEstimate, (float(self), self.std_error, self.num_paths))
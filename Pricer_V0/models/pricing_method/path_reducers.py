@@ -0,0 +1,89 @@
+# path_reducers.py
+
+import numpy as np
+
+
+# Réducteurs de statistiques de trajectoire. Le moteur de simulation appelle
+# update(step, spots) pour step = 0 (spot initial) .. time_steps avec le
+# vecteur des spots de toutes les trajectoires à cet instant ; chaque
+# réducteur ne garde qu'un état de taille num_paths, mis à jour en place.
+# L'étape 0 réinitialise cet état : un même réducteur sert lot après lot.
+
+class RunningMax:
+    def update(self, step, spots):
+        if step == 0:
+            self.value = spots.copy()
+        else:
+            np.maximum(self.value, spots, out=self.value)
+
+
+class RunningMin:
+    def update(self, step, spots):
+        if step == 0:
+            self.value = spots.copy()
+        else:
+            np.minimum(self.value, spots, out=self.value)
+
+
+class CrossingFlag:
+    """Vrai pour les trajectoires ayant touché level (par le haut si up)."""
+
+    def __init__(self, level, up):
+        self.level = level
+        self.up = up
+
+    def update(self, step, spots):
+        if step == 0:
+            self.value = np.zeros(spots.shape, dtype=bool)
+        if self.up:
+            self.value |= spots >= self.level
+        else:
+            self.value |= spots <= self.level
+
+
+class ObservationSum:
+    """Somme des spots (ou de leurs log) aux étapes d'observation.
+
+    observation_steps peut contenir des doublons : chaque étape compte
+    autant de fois qu'elle apparaît, comme une sélection de colonnes.
+    """
+
+    def __init__(self, observation_steps, log=False):
+        observation_steps = np.asarray(observation_steps, dtype=int)
+        self.weights = np.bincount(observation_steps)
+        self.count = len(observation_steps)
+        self.log = log
+
+    def update(self, step, spots):
+        if step == 0:
+            self.value = np.zeros(spots.shape)
+        if step < len(self.weights) and self.weights[step]:
+            observed = np.log(spots) if self.log else spots
+            self.value += self.weights[step] * observed
+
+    @property
+    def mean(self):
+        return self.value / self.count
+
+
+class ObservationMaturityDerivative(ObservationSum):
+    """Somme des dS/dT (ou d ln(S)/dT si log) aux étapes d'observation.
+
+    Les dates step_times[step] sont proportionnelles à T : par changement
+    d'échelle du brownien, S_k = S exp(drift t_k + sigma W(t_k)) donne
+    dS_k/dT = S_k (ln(S_k / S) + drift t_k) / (2T), drift = r - q - sigma²/2.
+    """
+
+    def __init__(self, observation_steps, step_times, spot, drift, maturity, log=False):
+        super().__init__(observation_steps, log)
+        self.step_times = np.asarray(step_times, dtype=float)
+        self.spot = spot
+        self.drift = drift
+        self.maturity = maturity
+
+    def update(self, step, spots):
+        if step == 0:
+            self.value = np.zeros(spots.shape)
+        if step < len(self.weights) and self.weights[step]:
+            log_derivative = (np.log(spots / self.spot) + self.drift * self.step_times[step]) / (2 * self.maturity)
+            self.value += self.weights[step] * (log_derivative if self.log else spots * log_derivative)
@@ -0,0 +1,71 @@
+# scenario_executor.py
+
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def _warm_up():
+    # Exécuté au démarrage de chaque worker : les imports coûteux sont faits une fois
+    import numpy  # noqa: F401
+    import scipy.special  # noqa: F401
+    import pricing_method.binomial_tree  # noqa: F401
+    import pricing_method.monte_carlo  # noqa: F401
+
+
+def _ping():
+    return os.getpid()
+
+
+class ScenarioExecutor:
+    """Pool de processus persistant pour évaluer des scénarios de pricing.
+
+    Les pricers sont du calcul pur (NumPy et boucles Python) : des threads
+    restent sérialisés par le GIL, d'où des processus. Le pool est créé au
+    premier usage, ses workers sont préchauffés puis réutilisés d'un appel
+    à l'autre. Sur une machine mono-cœur, avec parallel=False ou si le pool
+    est indisponible (pool cassé, plateforme sans multiprocessing), les
+    scénarios sont évalués dans le processus courant.
+    """
+
+    _pool = None
+    _max_workers = None
+
+    @classmethod
+    def get_pool(cls, max_workers=None):
+        max_workers = max_workers or os.cpu_count() or 1
+        if cls._pool is not None and cls._max_workers != max_workers:
+            cls.shutdown()
+        if cls._pool is None:
+            cls._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_up)
+            cls._max_workers = max_workers
+            # Démarre tous les workers sans attendre le premier lot de scénarios
+            for _ in range(max_workers):
+                cls._pool.submit(_ping)
+        return cls._pool
+
+    @classmethod
+    def run(cls, function, scenarios, parallel=True, max_workers=None):
+        """Évalue function(**kwargs) pour chaque scénario {nom: kwargs} et
+        renvoie {nom: résultat} dans le même ordre."""
+        workers = max_workers or os.cpu_count() or 1
+        if parallel and len(scenarios) > 1 and workers > 1:
+            try:
+                pool = cls.get_pool(workers)
+                futures = {name: pool.submit(function, **kwargs) for name, kwargs in scenarios.items()}
+                return {name: future.result() for name, future in futures.items()}
+            except (BrokenProcessPool, OSError):
+                cls.shutdown()
+
+        return {name: function(**kwargs) for name, kwargs in scenarios.items()}
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+        cls._pool = None
+        cls._max_workers = None
+
+
+atexit.register(ScenarioExecutor.shutdown)
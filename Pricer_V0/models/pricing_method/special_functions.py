@@ -0,0 +1,33 @@
+# special_functions.py
+
+import math
+import numpy as np
+from scipy.special import ndtr
+
+# Loi normale centrée réduite sans passer par scipy.stats.norm : celle-ci
+# valide ses arguments et construit une distribution à chaque appel (plusieurs
+# dizaines de µs par appel scalaire). Scalaires : module math ; tableaux :
+# ufunc ndtr et numpy.
+
+_INV_SQRT_2 = 1 / math.sqrt(2)
+_INV_SQRT_2PI = 1 / math.sqrt(2 * math.pi)
+
+
+def is_scalar(*values):
+    # Vrai si toutes les valeurs sont des nombres Python (ou numpy.float64)
+    return all(isinstance(value, (int, float)) for value in values)
+
+
+def norm_cdf(x):
+    """Fonction de répartition N(x) ; float pour un scalaire, tableau sinon."""
+    if isinstance(x, (int, float)):
+        return 0.5 * math.erfc(-x * _INV_SQRT_2)
+    return ndtr(x)
+
+
+def norm_pdf(x):
+    """Densité n(x) ; float pour un scalaire, tableau sinon."""
+    if isinstance(x, (int, float)):
+        return _INV_SQRT_2PI * math.exp(-0.5 * x * x)
+    x = np.asarray(x, dtype=float)
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
@@ -0,0 +1,122 @@
+# volatility_surface.py
+
+import math
+from bisect import bisect_left, insort
+import numpy as np
+from pricing_method.black_scholes import BlackScholesPricer
+
+
+class ImpliedVolSurface:
+    """Surface de volatilité implicite (strike, maturité) mise à jour par cotation.
+
+    Chaque maturité porte une tranche de strikes triés. update ne résout que
+    les cotations nouvelles ou modifiées, en repartant de leur volatilité
+    précédente. volatility(K, T) encadre T puis K par dichotomie (O(log n)) :
+    interpolation linéaire en strike, linéaire en variance totale sigma² T
+    entre maturités, extrapolation plate.
+    """
+
+    def __init__(self, spot, rate, dividend_yield=0.0):
+        self.spot = spot
+        self.rate = rate
+        self.dividend_yield = dividend_yield
+        self._quotes = {}    # (K, T) -> (prix, type)
+        self._vols = {}      # (K, T) -> volatilité implicite (nan si non inversible)
+        self._expiries = []  # maturités triées
+        self._strikes = {}   # T -> strikes triés des volatilités valides
+
+    def update(self, quotes):
+        """Intègre des cotations (strike, maturité, prix, "call"/"put").
+
+        Renvoie le nombre de cotations résolues.
+        """
+        changed = [(K, T, price, option_type) for K, T, price, option_type in quotes
+                   if self._quotes.get((K, T)) != (price, option_type)]
+        for K, T, price, option_type in changed:
+            self._quotes[(K, T)] = (price, option_type)
+        self._solve([(K, T) for K, T, _, _ in changed])
+        return len(changed)
+
+    def update_market(self, spot=None, rate=None, dividend_yield=None):
+        """Change spot, taux ou dividende : toutes les cotations sont résolues à nouveau."""
+        if spot is not None:
+            self.spot = spot
+        if rate is not None:
+            self.rate = rate
+        if dividend_yield is not None:
+            self.dividend_yield = dividend_yield
+        self._solve(list(self._quotes))
+
+    def remove(self, K, T):
+        self._quotes.pop((K, T), None)
+        self._set_vol(K, T, math.nan)
+        self._vols.pop((K, T), None)
+
+    def volatility(self, K, T):
+        """Volatilité implicite interpolée au point (K, T)."""
+        expiries = self._expiries
+        if not expiries:
+            raise ValueError("La surface ne contient aucune volatilité implicite.")
+
+        i = bisect_left(expiries, T)
+        if i < len(expiries) and expiries[i] == T:
+            return self._slice_vol(K, T)
+        if i == 0:
+            return self._slice_vol(K, expiries[0])
+        if i == len(expiries):
+            return self._slice_vol(K, expiries[-1])
+
+        # Interpolation linéaire en variance totale
+        T1, T2 = expiries[i - 1], expiries[i]
+        w1 = self._slice_vol(K, T1)**2 * T1
+        w2 = self._slice_vol(K, T2)**2 * T2
+        w = w1 + (w2 - w1) * (T - T1) / (T2 - T1)
+        return math.sqrt(max(w, 0.0) / T)
+
+    def _slice_vol(self, K, T):
+        # Interpolation linéaire en strike dans la tranche T, extrapolation plate
+        strikes = self._strikes[T]
+        j = bisect_left(strikes, K)
+        if j < len(strikes) and strikes[j] == K:
+            return self._vols[(K, T)]
+        if j == 0:
+            return self._vols[(strikes[0], T)]
+        if j == len(strikes):
+            return self._vols[(strikes[-1], T)]
+        K1, K2 = strikes[j - 1], strikes[j]
+        v1, v2 = self._vols[(K1, T)], self._vols[(K2, T)]
+        return v1 + (v2 - v1) * (K - K1) / (K2 - K1)
+
+    def _solve(self, keys):
+        if not keys:
+            return
+        K, T = (np.array(values, dtype=float) for values in zip(*keys))
+        prices = np.array([self._quotes[key][0] for key in keys], dtype=float)
+        option_types = np.array([self._quotes[key][1] for key in keys])
+        # Départ à chaud depuis la volatilité précédente (nan -> point de départ standard)
+        previous = np.array([self._vols.get(key, math.nan) for key in keys])
+
+        vols = np.atleast_1d(BlackScholesPricer.implied_volatility_batch(
+            prices, self.spot, K, T, self.rate, self.dividend_yield, option_types,
+            initial_guess=previous))
+        for key, vol in zip(keys, vols):
+            self._set_vol(*key, float(vol))
+
+    def _set_vol(self, K, T, vol):
+        # Tient à jour les tranches triées : seules les volatilités valides y figurent
+        was_valid = not math.isnan(self._vols.get((K, T), math.nan))
+        self._vols[(K, T)] = vol
+        is_valid = not math.isnan(vol)
+        if is_valid == was_valid:
+            return
+
+        strikes = self._strikes.setdefault(T, [])
+        if is_valid:
+            if not strikes:
+                insort(self._expiries, T)
+            insort(strikes, K)
+        else:
+            strikes.pop(bisect_left(strikes, K))
+            if not strikes:
+                del self._strikes[T]
+                self._expiries.pop(bisect_left(self._expiries, T))
@@ -0,0 +1,7 @@
+# conftest.py
+
+import os
+import sys
+
+# Imports absolus depuis Pricer_V0/models, comme dans les notebooks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
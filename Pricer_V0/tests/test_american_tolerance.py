@@ -0,0 +1,25 @@
+# test_american_tolerance.py
+
+import warnings
+import pytest
+from pricing_method.binomial_tree import BinomialTreePricer
+
+
+@pytest.mark.parametrize("T, r, sigma, q", [(2.0, 0.02, 0.15, 0.0), (1.0, 0.10, 0.25, 0.03), (2.0, 0.02, 0.40, 0.0)])
+def test_tolerance_is_met_against_a_fine_tree(T, r, sigma, q):
+    # Put K = 120 : l'ancien critère (un seul écart) s'arrêtait à plus de tol de la référence
+    reference = BinomialTreePricer.price_vanilla_american(100.0, 120.0, T, r, sigma, q, "put", 20_000, True)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        price = BinomialTreePricer.price_vanilla_american_tol(100.0, 120.0, T, r, sigma, q, "put", tol=1e-3)
+    assert price == pytest.approx(reference, abs=1e-3)
+
+
+def test_max_steps_warns():
+    with pytest.warns(RuntimeWarning):
+        BinomialTreePricer.price_vanilla_american_tol(100.0, 120.0, 1.0, 0.05, 0.25, 0.0, "put", tol=1e-12, max_steps=256)
+
+
+def test_bbsr_rejects_fewer_than_two_steps():
+    with pytest.raises(ValueError):
+        BinomialTreePricer.price_vanilla_american_bbsr(100.0, 100.0, 1.0, 0.05, 0.2, 0.0, "put", steps=1)
@@ -0,0 +1,31 @@
+# test_asian_theta.py
+
+import pytest
+from greek_method.closed_form_greek import ClosedFormGreek
+from greek_method.monte_carlo_greek import MonteCarloGreek
+from option_models.asian_option import AsianOption
+from pricing_method.closed_form import ClosedFormPricer
+
+MARKET = dict(spot=100.0, strike=100.0, maturity=1.0, rate=0.05, volatility=0.25, dividend_yield=0.01)
+
+
+@pytest.mark.parametrize("type_option", ["call", "put"])
+def test_geometric_monte_carlo_theta_matches_closed_form(type_option):
+    closed_form = ClosedFormGreek.geometric_asian_greeks(
+        type_option, num_observations=ClosedFormPricer.observation_count(1.0, "weekly"), **MARKET)
+    monte_carlo = MonteCarloGreek.montecarlo_asian_greeks(
+        type_option, average_type="geometric", observation_frequency="weekly",
+        num_paths=200_000, seed=1, parallel=False, **MARKET)
+    # Monte Carlo : dV/dT ; formule fermée : dV/dt
+    assert -monte_carlo["Theta"] == pytest.approx(float(closed_form["Theta"]), rel=0.05)
+
+
+@pytest.mark.parametrize("type_option", ["call", "put"])
+def test_asian_option_theta_sign_does_not_depend_on_average_type(type_option):
+    options = {average_type: AsianOption(average_type, observation_frequency="weekly", type_option=type_option,
+                                         time_type="years", **MARKET)
+               for average_type in ("arithmetic", "geometric")}
+    arithmetic = options["arithmetic"].greek(num_paths=100_000, seed=1)["Theta"]
+    geometric = options["geometric"].greek()["Theta"]
+    assert arithmetic < 0 and geometric < 0
+    assert arithmetic == pytest.approx(geometric, rel=0.25)
@@ -0,0 +1,40 @@
+# test_binomial_barrier_greeks.py
+
+import pytest
+from greek_method.binomial_tree_greek import BinomialTreeGreek
+from greek_method.closed_form_greek import ClosedFormGreek
+
+MARKET = dict(spot=100.0, strike=100.0, maturity=1.0, rate=0.05, volatility=0.25, dividend_yield=0.01)
+BARRIERS = [("call", 120.0, "up-and-out"), ("put", 90.0, "down-and-out"),
+            ("call", 90.0, "down-and-in"), ("put", 120.0, "up-and-in")]
+
+
+def tree_greeks(type_option, barrier_level, barrier_type, steps, lattice="interpolated"):
+    return BinomialTreeGreek.binomial_barrier_greeks(
+        MARKET["spot"], MARKET["strike"], MARKET["maturity"], MARKET["rate"], MARKET["volatility"],
+        MARKET["dividend_yield"], type_option, barrier_level, barrier_type,
+        steps=steps, lattice=lattice, parallel=False)
+
+
+@pytest.mark.parametrize("type_option, barrier_level, barrier_type", BARRIERS)
+@pytest.mark.parametrize("lattice", ["interpolated", "aligned"])
+def test_tree_greeks_converge_to_closed_form(type_option, barrier_level, barrier_type, lattice):
+    closed_form = ClosedFormGreek.barrier_greeks(type_option, barrier_level=barrier_level,
+                                                 barrier_type=barrier_type, **MARKET)
+    greeks = tree_greeks(type_option, barrier_level, barrier_type, 1000, lattice)
+    # L'arbre renvoie dV/dT, la formule fermée dV/dt
+    greeks["Theta"] = -greeks["Theta"]
+    for key, tolerance in (("Delta", 2e-3), ("Gamma", 2e-4), ("Vega", 0.1), ("Theta", 0.03), ("Rho", 0.1)):
+        assert greeks[key] == pytest.approx(float(closed_form[key]), abs=tolerance), key
+
+
+def test_tree_vega_error_shrinks_with_steps():
+    # Géométrie fixe entre scénarios : plus de dent de scie liée à la couche-barrière
+    closed_form = float(ClosedFormGreek.barrier_greeks("call", barrier_level=120.0, barrier_type="up-and-out", **MARKET)["Vega"])
+    errors = [abs(tree_greeks("call", 120.0, "up-and-out", steps)["Vega"] - closed_form) for steps in (200, 1000)]
+    assert errors[1] < errors[0]
+
+
+def test_tree_greeks_reject_too_few_steps():
+    with pytest.raises(ValueError):
+        tree_greeks("call", 120.0, "up-and-out", 2)
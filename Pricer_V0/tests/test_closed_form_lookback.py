@@ -0,0 +1,37 @@
+# test_closed_form_lookback.py
+
+import pytest
+from pricing_method.closed_form import ClosedFormPricer
+from greek_method.closed_form_greek import ClosedFormGreek
+
+MARKET = dict(strike=100.0, maturity=1.0, rate=0.05, volatility=0.25, dividend_yield=0.01)
+
+
+def discrete_fixed_price(type_option, spot):
+    return ClosedFormPricer.price_lookback(type_option, spot, strike_type="fixed", num_observations=100, **MARKET)
+
+
+@pytest.mark.parametrize("type_option", ["call", "put"])
+def test_discrete_fixed_strike_is_smooth_at_the_money(type_option):
+    # Pas de point anguleux en S = K : Delta à gauche = Delta à droite
+    h = 1e-3
+    left = (discrete_fixed_price(type_option, 100.0) - discrete_fixed_price(type_option, 100.0 - h)) / h
+    right = (discrete_fixed_price(type_option, 100.0 + h) - discrete_fixed_price(type_option, 100.0)) / h
+    assert right == pytest.approx(left, abs=1e-3)
+
+
+@pytest.mark.parametrize("type_option", ["call", "put"])
+def test_discrete_fixed_strike_gamma_matches_wide_bump(type_option):
+    greeks = ClosedFormGreek.lookback_greeks(type_option, 100.0, strike_type="fixed", num_observations=100, **MARKET)
+    wide_gamma = (discrete_fixed_price(type_option, 101.0) - 2 * discrete_fixed_price(type_option, 100.0)
+                  + discrete_fixed_price(type_option, 99.0))
+    assert 0 < greeks["Gamma"] < 0.1
+    assert greeks["Gamma"] == pytest.approx(wide_gamma, rel=2e-2)
+
+
+def test_observed_extreme_is_not_shifted():
+    # Un maximum observé très au-dessus du spot fixe la valeur acquise telle quelle
+    price = ClosedFormPricer.price_lookback("call", 100.0, strike_type="fixed", max_price_observed=200.0,
+                                            num_observations=100, **MARKET)
+    assert price >= (200.0 - MARKET["strike"]) * 0.95
+    assert price < (200.0 - MARKET["strike"]) / 0.95
@@ -0,0 +1,40 @@
+# test_finite_difference_degenerate.py
+
+import warnings
+import pytest
+from greek_method.black_scholes_greek import BlackScholesGreek
+from pricing_method.finite_difference import FiniteDifferencePricer
+
+KEYS = ("Price", "Delta", "Gamma", "Theta")
+
+
+@pytest.mark.parametrize("S, K, T, sigma, option_type", [
+    (100.0, 100.0, 0.0, 0.2, "call"), (100.0, 100.0, 1.0, 0.0, "call"),
+    (100.0, 110.0, 1.0, 0.0, "put"), (100.0, 90.0, 0.0, 0.2, "put")])
+def test_vanilla_without_time_value_matches_black_scholes(S, K, T, sigma, option_type):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        greeks = FiniteDifferencePricer.price_vanilla(S, K, T, 0.05, sigma, 0.01, option_type)
+    expected = BlackScholesGreek.bs_price_greeks(S, K, T, 0.05, sigma, 0.01, option_type)
+    for key in KEYS:
+        assert greeks[key] == pytest.approx(float(expected[key]), abs=1e-12), key
+
+
+def test_american_without_time_value_is_at_least_intrinsic():
+    greeks = FiniteDifferencePricer.price_vanilla(100.0, 110.0, 0.5, 0.05, 0.0, 0.0, "put", american=True)
+    assert greeks["Price"] == pytest.approx(10.0)
+    assert greeks["Delta"] == pytest.approx(-1.0)
+
+
+def test_crossed_knock_in_without_time_value_is_finite():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        greeks = FiniteDifferencePricer.price_barrier("call", 100.0, 100.0, 0.0, 0.05, 0.2, 0.01, 105.0, "down-and-in")
+    assert greeks == {"Price": 0.0, "Delta": 0.5, "Gamma": 0.0, "Theta": pytest.approx(-2.0)}
+
+
+def test_barrier_at_expiry_pays_vanilla_or_rebate():
+    knock_out = FiniteDifferencePricer.price_barrier("put", 90.0, 100.0, 0.0, 0.05, 0.2, 0.0, 80.0, "down-and-out")
+    knock_in = FiniteDifferencePricer.price_barrier("put", 90.0, 100.0, 0.0, 0.05, 0.2, 0.0, 80.0, "down-and-in", rebate=1.0)
+    assert knock_out["Price"] == pytest.approx(10.0)
+    assert knock_in["Price"] == pytest.approx(1.0)